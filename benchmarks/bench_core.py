@@ -0,0 +1,272 @@
+"""Microbenchmarks for core primitives
+
+Run with `python -m benchmarks.bench_core`. Every input is fixed and seeded and
+memory reads go through an in-memory hook, so no emulator is needed.
+
+Rates are compared as scores, ops/s divided by the rate of a fixed pure Python
+calibration loop measured alongside in the same process, so a baseline recorded
+on a faster or slower machine still catches regressions. Without a baseline file
+the first run records one
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import timeit
+
+from PIL import Image
+
+from core.hook.backend import MemoryBackend
+from core.hook.hook import Hook
+from core.hook.socket_hook import SocketHook
+from core.hook.socket_server import LocalReadServer
+from core.pkm.pk3 import PK3, BLOCK_POSITION
+from core.rng import LCRNG
+from core.util import lcrng_distance, sprite_texture_data
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+# allowed slowdown against the baseline, in percent
+DEFAULT_THRESHOLD = 25
+CALIBRATION_STEPS = 1000
+
+
+class BytesBackend(MemoryBackend):
+    """Backend reading from a local buffer"""
+
+    name = "bytes"
+
+    def __init__(self, buf: bytearray) -> None:
+        self.buf = buf
+
+    def read(self, address: int, length: int) -> bytes:
+        return bytes(self.buf[address:address + length])
+
+
+class MemoryHook(Hook):
+    """Hook over an in-memory copy of WRAM"""
+
+    def __init__(self, buf: bytearray) -> None:
+        super().__init__()
+        self.backend = BytesBackend(buf)
+        self.is_initialized = True
+
+    def detect_memory_bases(self) -> None:
+        pass
+
+    def convert_address(self, address: int) -> int:
+        return address - 0x2000000
+
+
+def encrypt_pk3(pid: int, otid: int, species: int, iv32: int) -> bytes:
+    """Build an encrypted PK3 with a valid checksum"""
+    blocks = [bytearray(12) for _ in range(4)]
+    blocks[0][0:2] = species.to_bytes(2, "little")
+    blocks[3][4:8] = iv32.to_bytes(4, "little")
+    data = bytearray(48)
+    order = (pid % 24) * 4
+    for block in range(4):
+        position = BLOCK_POSITION[order + block]
+        data[12 * position:12 * (position + 1)] = blocks[block]
+    checksum = sum(int.from_bytes(data[i:i + 2], "little") for i in range(0, 48, 2)) & 0xFFFF
+    key = pid ^ otid
+    for i in range(0, 48, 4):
+        data[i:i + 4] = (int.from_bytes(data[i:i + 4], "little") ^ key).to_bytes(4, "little")
+    buf = bytearray(0x20)
+    buf[0:4] = pid.to_bytes(4, "little")
+    buf[4:8] = otid.to_bytes(4, "little")
+    buf[0x1C:0x1E] = checksum.to_bytes(2, "little")
+    return bytes(buf + data)
+
+
+def make_inputs() -> dict:
+    """Fixed benchmark inputs"""
+    rand = random.Random(0x5EED)
+    seed_pairs = []
+    for _ in range(256):
+        seed = rand.getrandbits(32)
+        seed_pairs.append((seed, LCRNG.advance(seed, rand.getrandbits(32))))
+    # one blob per block order
+    pk3_blobs = []
+    for order in range(24):
+        # 2**27 * 24 < 2**32
+        pid = rand.getrandbits(27) * 24 + order
+        pk3_blobs.append(
+            encrypt_pk3(pid, rand.getrandbits(32), rand.randrange(1, 412), rand.getrandbits(30))
+        )
+    wram = bytearray(rand.getrandbits(8) for _ in range(0x1000))
+    server = LocalReadServer(
+        {0x2000000: bytearray(0x40000), 0x3000000: bytearray(0x8000)}
+    ).start()
+    socket_hook = SocketHook()
+    socket_hook.hook(server.port)
+    sprite = Image.frombytes(
+        "RGBA",
+        (68, 56),
+        bytes(rand.getrandbits(8) for _ in range(68 * 56 * 4))
+    )
+    return {
+        "seed_pairs": seed_pairs,
+        "pk3_blobs": pk3_blobs,
+        "hook": MemoryHook(wram),
+        "socket_server": server,
+        "socket_hook": socket_hook,
+        "sprite": sprite,
+    }
+
+
+def get_benchmarks(inputs: dict) -> dict:
+    """name -> (function, operations per call)"""
+    seed_pairs = inputs["seed_pairs"]
+    pk3_blobs = inputs["pk3_blobs"]
+    pk3s = [PK3(blob) for blob in pk3_blobs]
+    hook = inputs["hook"]
+    sprite = inputs["sprite"]
+    socket_server = inputs["socket_server"]
+    socket_hook = inputs["socket_hook"]
+    # party, wild, current seed, vframe and the save block pointers (USA Emerald)
+    frame_ranges = (
+        (0x20244EC, 6 * 0x64),
+        (0x2024744, 0x50),
+        (0x3005D80, 4),
+        (0x30022E4, 4),
+        (0x3005D90, 4),
+        (0x3005D8C, 4),
+    )
+    # subscribe and wait for the first snapshot so prefetches skip the round trip
+    socket_hook.prefetch(frame_ranges)
+    while socket_hook.backend.latest(*frame_ranges[0]) is None:
+        socket_server.frame()
+        time.sleep(0.001)
+
+    def distance():
+        for state0, state1 in seed_pairs:
+            lcrng_distance(state0, state1)
+
+    def pk3_decrypt():
+        for blob in pk3_blobs:
+            PK3(blob)
+
+    def pk3_properties():
+        for pk3 in pk3s:
+            _ = pk3.pid, pk3.species, pk3.ivs, pk3.shiny, pk3.is_valid
+
+    def hook_read_uint():
+        for address in range(0x2000000, 0x2001000, 0x10):
+            hook.read_uint(address, 4)
+
+    def sprite_conversion():
+        sprite_texture_data(sprite)
+
+    def socket_frame_reads():
+        socket_hook.prefetch(frame_ranges)
+
+    def socket_round_trip():
+        socket_hook.read_many(frame_ranges)
+
+    return {
+        "lcrng_distance": (distance, len(seed_pairs)),
+        "pk3_decrypt": (pk3_decrypt, len(pk3_blobs)),
+        "pk3_properties": (pk3_properties, len(pk3s)),
+        "hook_read_uint": (hook_read_uint, 0x100),
+        "sprite_conversion": (sprite_conversion, 1),
+        "socket_frame_reads": (socket_frame_reads, 1),
+        "socket_round_trip": (socket_round_trip, 1),
+    }
+
+
+def batch_size(function, target: float = 0.02) -> int:
+    """Calls of function taking roughly target seconds"""
+    timer = timeit.Timer(function)
+    number, elapsed = timer.autorange()
+    return max(1, round(number * target / elapsed))
+
+
+def calibration() -> None:
+    """Fixed interpreter workload (integer math, indexing, calls) used as the unit of speed"""
+    state = 0
+    table = list(range(256))
+    for _ in range(CALIBRATION_STEPS):
+        state = (state * 0x41C64E6D + 0x6073) & 0xFFFFFFFF
+        table[state >> 24] = abs(state - table[state & 0xFF])
+
+
+def measure(function, operations: int, rounds: int = 25) -> tuple[float, float]:
+    """Median ops/s and median score (ops/s per calibration loop/s) of function
+
+    Short calibration and benchmark batches alternate so both see the same
+    machine state, and the median of the per-round ratios is kept
+    """
+    function_number = batch_size(function)
+    calibration_number = batch_size(calibration)
+    rates = []
+    scores = []
+    for _ in range(rounds):
+        calibration_rate = (
+            calibration_number / timeit.timeit(calibration, number=calibration_number)
+        )
+        rate = operations * function_number / timeit.timeit(function, number=function_number)
+        rates.append(rate)
+        scores.append(rate / calibration_rate)
+    return statistics.median(rates), statistics.median(scores)
+
+
+def main():
+    """Run the benchmarks and compare with the baseline"""
+    parser = argparse.ArgumentParser(description="Core primitive microbenchmarks")
+    parser.add_argument("--update-baseline", action="store_true", help="store results as baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed regression in percent",
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    measurements = {
+        name: measure(function, operations)
+        for name, (function, operations) in get_benchmarks(make_inputs()).items()
+    }
+    results = {name: rate for name, (rate, _) in measurements.items()}
+    scores = {name: score for name, (_, score) in measurements.items()}
+
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+    except FileNotFoundError:
+        baseline = None
+
+    if args.update_baseline or baseline is None:
+        if baseline is None:
+            print(f"No baseline found, recording {args.baseline}")
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(
+                {name: round(score, 4) for name, score in scores.items()},
+                baseline_file,
+                indent=4
+            )
+            baseline_file.write("\n")
+        baseline = scores
+
+    regressions = []
+    for name, rate in results.items():
+        line = f"{name:<20} {rate:>14,.0f} ops/s {scores[name]:>10.4f} score"
+        if name in baseline:
+            change = (scores[name] / baseline[name] - 1) * 100
+            line += f" ({change:+.1f}% vs baseline)"
+            if change < -args.threshold:
+                regressions.append(name)
+                line += " REGRESSION"
+        print(line)
+
+    if regressions:
+        print(f"Regressed by more than {args.threshold}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
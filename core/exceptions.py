@@ -2,3 +2,6 @@
 
 class AddressOutOfRange(NotImplementedError):
     """Ram address outside of configured ranges"""
+
+class EmulatorNotResponding(Exception):
+    """Emulator did not answer a read in time, usually because it is paused"""
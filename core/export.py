@@ -0,0 +1,126 @@
+"""Chunked export of RNG results to memory-mapped .npy columns
+
+An export is a directory with one 1-D .npy file per field, so
+pd.DataFrame(load_export(path)) or np.load of a single column works directly
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable
+import json
+import os
+
+import numpy as np
+
+from .generator import METHOD1_DTYPE, method1_array
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def column_path(path: str, field: str) -> str:
+    """Path of one column of an export"""
+    return os.path.join(path, f"{field}.npy")
+
+
+def load_export(path: str) -> dict[str, np.ndarray]:
+    """Memory-mapped columns of an export by field name"""
+    return {
+        field: np.load(column_path(path, field), mmap_mode="r")
+        for field in METHOD1_DTYPE.names
+    }
+
+
+def progress_path(path: str) -> str:
+    """Path of the resume file kept next to an export"""
+    return f"{path}.progress.json"
+
+
+def export_chunk(
+    path: str,
+    seed: int,
+    start: int,
+    count: int,
+    tsv: int | None,
+    chunk_size: int,
+    chunk: int,
+) -> int:
+    """Generate one chunk and write it straight into the column files"""
+    offset = chunk * chunk_size
+    length = min(chunk_size, count - offset)
+    results = method1_array(seed, start + offset, length, tsv)
+    for field in METHOD1_DTYPE.names:
+        column = np.load(column_path(path, field), mmap_mode="r+")
+        column[offset:offset + length] = results[field]
+        column.flush()
+        del column
+    return chunk
+
+
+def load_progress(path: str, params: dict) -> set[int] | None:
+    """Chunks already written by an interrupted export with the same parameters"""
+    try:
+        with open(progress_path(path), "r", encoding="utf-8") as progress_file:
+            progress = json.load(progress_file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if progress["params"] != params or not os.path.isdir(path):
+        return None
+    return set(progress["done"])
+
+
+def save_progress(path: str, params: dict, done: set[int]) -> None:
+    """Atomically record finished chunks"""
+    temp_path = f"{progress_path(path)}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as progress_file:
+        json.dump({"params": params, "done": sorted(done)}, progress_file)
+    os.replace(temp_path, progress_path(path))
+
+
+def export_method1(
+    path: str,
+    seed: int,
+    count: int,
+    start: int = 0,
+    tsv: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = None,
+    progress: Callable[[int, int], None] = None,
+) -> None:
+    """Stream method 1 results for count advances from start into a directory of .npy columns
+
+    Chunks are generated in parallel from jump-ahead offsets and written
+    directly to the memory-mapped output, so memory use does not grow with
+    count. Rerunning an interrupted export with the same parameters resumes it.
+    """
+    params = {
+        "seed": seed,
+        "start": start,
+        "count": count,
+        "tsv": tsv,
+        "chunk_size": chunk_size,
+    }
+    done = load_progress(path, params)
+    if done is None:
+        done = set()
+        os.makedirs(path, exist_ok=True)
+        for field in METHOD1_DTYPE.names:
+            column = np.lib.format.open_memmap(
+                column_path(path, field),
+                mode="w+",
+                dtype=METHOD1_DTYPE[field],
+                shape=(count,)
+            )
+            del column
+        save_progress(path, params, done)
+    chunk_count = -(-count // chunk_size)
+    remaining = [chunk for chunk in range(chunk_count) if chunk not in done]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [
+            executor.submit(export_chunk, path, seed, start, count, tsv, chunk_size, chunk)
+            for chunk in remaining
+        ]
+        for future in as_completed(futures):
+            done.add(future.result())
+            save_progress(path, params, done)
+            if progress is not None:
+                progress(len(done), chunk_count)
+    os.remove(progress_path(path))
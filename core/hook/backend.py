@@ -0,0 +1,209 @@
+"""Memory read backends"""
+
+from abc import abstractmethod
+import contextlib
+import ctypes
+import logging
+import os
+import platform
+import time
+import mem_edit
+
+
+class MemoryBackend:
+    """Base class for reading memory of a hooked process"""
+
+    name = "backend"
+
+    @abstractmethod
+    def read(self, address: int, length: int) -> bytes:
+        """Read length bytes at a process address"""
+
+    def read_many(self, ranges: list[tuple[int, int]]) -> list[bytes]:
+        """Read several (address, length) ranges"""
+        return [self.read(address, length) for address, length in ranges]
+
+    def close(self) -> None:
+        """Release backend resources"""
+
+
+class MemEditBackend(MemoryBackend):
+    """Read through mem_edit, one region per call"""
+
+    name = "mem_edit"
+
+    def __init__(self, process: mem_edit.Process) -> None:
+        self.process = process
+
+    def read(self, address: int, length: int) -> bytes:
+        return bytes(self.process.read_memory(address, (ctypes.c_ubyte * length)()))
+
+
+class ProcMemBackend(MemoryBackend):
+    """pread from a persistent /proc/<pid>/mem descriptor (Linux)"""
+
+    name = "/proc/pid/mem"
+
+    def __init__(self, pid: int) -> None:
+        self.fd = os.open(f"/proc/{pid}/mem", os.O_RDONLY)
+
+    def read(self, address: int, length: int) -> bytes:
+        data = os.pread(self.fd, length, address)
+        if len(data) != length:
+            raise OSError(f"Short read at {address:X}")
+        return data
+
+    def close(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class IOVec(ctypes.Structure):
+    """struct iovec"""
+
+    _fields_ = (
+        ("iov_base", ctypes.c_void_p),
+        ("iov_len", ctypes.c_size_t),
+    )
+
+
+class ProcessVMReadvBackend(MemoryBackend):
+    """Scatter-gather reads with process_vm_readv (Linux)"""
+
+    name = "process_vm_readv"
+    # IOV_MAX
+    MAX_RANGES = 1024
+
+    def __init__(self, pid: int) -> None:
+        self.pid = pid
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.process_vm_readv = libc.process_vm_readv
+        self.process_vm_readv.restype = ctypes.c_ssize_t
+        self.process_vm_readv.argtypes = (
+            ctypes.c_int,
+            ctypes.POINTER(IOVec),
+            ctypes.c_ulong,
+            ctypes.POINTER(IOVec),
+            ctypes.c_ulong,
+            ctypes.c_ulong,
+        )
+
+    def read(self, address: int, length: int) -> bytes:
+        return self.read_many(((address, length),))[0]
+
+    def read_many(self, ranges: list[tuple[int, int]]) -> list[bytes]:
+        results = []
+        for start in range(0, len(ranges), self.MAX_RANGES):
+            results.extend(self._read_batch(ranges[start:start + self.MAX_RANGES]))
+        return results
+
+    def _read_batch(self, ranges: list[tuple[int, int]]) -> list[bytes]:
+        """Read up to MAX_RANGES ranges into one buffer with a single syscall"""
+        total = sum(length for _, length in ranges)
+        buffer = ctypes.create_string_buffer(total)
+        local = (IOVec * len(ranges))()
+        remote = (IOVec * len(ranges))()
+        offset = 0
+        for i, (address, length) in enumerate(ranges):
+            local[i].iov_base = ctypes.addressof(buffer) + offset
+            local[i].iov_len = length
+            remote[i].iov_base = address
+            remote[i].iov_len = length
+            offset += length
+        read = self.process_vm_readv(self.pid, local, len(ranges), remote, len(ranges), 0)
+        if read != total:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno) if read < 0 else "Short read")
+        data = buffer.raw
+        results = []
+        offset = 0
+        for _, length in ranges:
+            results.append(data[offset:offset + length])
+            offset += length
+        return results
+
+
+def available_backends(pid: int, process: mem_edit.Process) -> list[MemoryBackend]:
+    """Construct every backend usable on this platform"""
+    backends = [MemEditBackend(process)]
+    if platform.system() == "Linux":
+        for backend_type in (ProcMemBackend, ProcessVMReadvBackend):
+            try:
+                backends.append(backend_type(pid))
+            except (OSError, AttributeError) as error:
+                logging.info(f"{backend_type.name} unavailable: {error}")
+    return backends
+
+
+def validate_backend(
+    backend: MemoryBackend,
+    reference: MemoryBackend,
+    address: int,
+    length: int,
+    attempts: int = 5,
+) -> bool:
+    """Whether backend reads the same data as the reference backend
+
+    The benchmark region is live game memory, so the backend's read is compared
+    against reference reads taken right before and after it, retrying when the
+    memory changed in between
+    """
+    for _ in range(attempts):
+        before = reference.read(address, length)
+        data = backend.read(address, length)
+        after = reference.read(address, length)
+        if data in (before, after):
+            return True
+    return False
+
+
+def benchmark_backend(
+    backend: MemoryBackend,
+    address: int,
+    length: int,
+    iterations: int,
+) -> float:
+    """Reads per second of length bytes at address"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        backend.read(address, length)
+    return iterations / (time.perf_counter() - start)
+
+
+def select_backend(
+    pid: int,
+    process: mem_edit.Process,
+    address: int,
+    length: int = 0x50,
+    iterations: int = 200,
+) -> tuple[MemoryBackend, dict[str, float]]:
+    """Benchmark the available backends and keep the fastest
+
+    Returns the chosen backend and reads/second of each backend that
+    produced the same data as mem_edit
+    """
+    backends = available_backends(pid, process)
+    reference = backends[0]
+    throughput = {}
+    working = []
+    for backend in backends:
+        try:
+            if backend is not reference and not validate_backend(backend, reference, address, length):
+                raise OSError("Read mismatch")
+            throughput[backend.name] = benchmark_backend(backend, address, length, iterations)
+            working.append(backend)
+        except OSError as error:
+            logging.info(f"{backend.name} failed: {error}")
+            backend.close()
+    best = max(working, key=lambda backend: throughput[backend.name])
+    for backend in working:
+        if backend is not best:
+            with contextlib.suppress(OSError):
+                backend.close()
+    logging.info(
+        f"Using {best.name} memory backend ("
+        + ", ".join(f"{name}: {rate:.0f} reads/s" for name, rate in throughput.items())
+        + ")"
+    )
+    return best, throughput
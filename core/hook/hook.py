@@ -5,12 +5,22 @@ import contextlib
 import ctypes
 import struct
 import mem_edit
+from .backend import MemoryBackend, MemEditBackend, select_backend
+from .pointer import PointerChain
 
 class Hook:
     """Base class for hooking into a process"""
 
+    # address used to benchmark memory backends, None to skip benchmarking
+    BENCHMARK_ADDRESS = None
+
     def __init__(self, pid: int = None) -> None:
         self.process = None
+        self.backend: MemoryBackend = None
+        self.backend_throughput: dict[str, float] = {}
+        self.pointer_chains: dict[tuple[int, tuple[int, ...]], PointerChain] = {}
+        # (address, data) of ranges read by the last prefetch
+        self.prefetched: list[tuple[int, bytes]] = []
         self.is_initialized = False
         if pid is not None:
             self.hook(pid)
@@ -22,6 +32,19 @@ class Hook:
         self.process = mem_edit.Process(pid)
 
         self.detect_memory_bases()
+        self.select_backend(pid)
+
+    def select_backend(self, pid: int) -> None:
+        """Pick the fastest memory backend for this process"""
+        if not self.is_initialized or self.BENCHMARK_ADDRESS is None:
+            self.backend = MemEditBackend(self.process)
+            self.backend_throughput = {}
+            return
+        self.backend, self.backend_throughput = select_backend(
+            pid,
+            self.process,
+            self.convert_address(self.BENCHMARK_ADDRESS)
+        )
 
     @abstractmethod
     def detect_memory_bases(self) -> None:
@@ -31,14 +54,26 @@ class Hook:
     def convert_address(self, address: int) -> int:
         """Convert address to mem_edit address"""
 
-    def read_bytes(self, address: int, length: int) -> bytes:
-        """Read bytes at specified address"""
-        return_buffer = (ctypes.c_ubyte * length)()
-        return bytes(
-            self.process.read_memory(
-                self.convert_address(address),
-                return_buffer
-            )
+    def read_bytes(self, address: int, length: int, cached: bool = True) -> bytes:
+        """Read bytes at specified address
+
+        Reads inside a prefetched range are served from the prefetch unless cached is False
+        """
+        if cached:
+            for start, data in self.prefetched:
+                if start <= address and address + length <= start + len(data):
+                    return data[address - start:address - start + length]
+        return self.backend.read(self.convert_address(address), length)
+
+    def prefetch(self, ranges: list[tuple[int, int]]) -> None:
+        """Read ranges in one batch, replacing the previous prefetch"""
+        self.prefetched = []
+        self.prefetched = list(zip((address for address, _ in ranges), self.read_many(ranges)))
+
+    def read_many(self, ranges: list[tuple[int, int]]) -> list[bytes]:
+        """Read several (address, length) ranges, batched where the backend allows"""
+        return self.backend.read_many(
+            [(self.convert_address(address), length) for address, length in ranges]
         )
 
     def read_struct(self, address: int, schema: str):
@@ -51,7 +86,7 @@ class Hook:
     def read_ctype(self, address: int, ctype):
         """Read ctype type at address"""
         # TODO: validation, game reading
-        return self.process.read_memory(self.convert_address(address), ctype())
+        return ctype.from_buffer_copy(self.read_bytes(address, ctypes.sizeof(ctype)))
 
     def read_int(self, address: int, length: int) -> int:
         """Read integer at specified address"""
@@ -69,9 +104,23 @@ class Hook:
             signed=False
         )
 
+    def pointer_chain(self, root: int, *offsets: int) -> PointerChain:
+        """Shared cached pointer chain from root through offsets"""
+        key = (root, offsets or (0,))
+        if key not in self.pointer_chains:
+            self.pointer_chains[key] = PointerChain(self, *key)
+        return self.pointer_chains[key]
+
     def detach(self) -> None:
         """Detach from process"""
         self.is_initialized = False
+        self.prefetched = []
+        for chain in self.pointer_chains.values():
+            chain.invalidate()
+        if self.backend is not None:
+            with contextlib.suppress(OSError):
+                self.backend.close()
+            self.backend = None
         if self.process is not None:
             with contextlib.suppress(ChildProcessError, mem_edit.utils.MemEditError):
                 self.process.close()
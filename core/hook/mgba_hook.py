@@ -7,6 +7,8 @@ from ..exceptions import AddressOutOfRange
 class MGBAHook(Hook):
     """Class for hooking into mGBA"""
 
+    BENCHMARK_ADDRESS = 0x2000000
+
     def __init__(self, pid: int = None) -> None:
         self.wram_base = None
         self.iram_base = None
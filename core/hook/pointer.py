@@ -0,0 +1,46 @@
+"""Cached pointer chains"""
+
+
+class PointerChain:
+    """Pointer chain rooted at a static address
+
+    The resolved address is cached and only re-resolved when the root pointer
+    moves, so checking it costs a single read. Pointers further down the chain
+    are assumed to move only together with the root.
+    """
+
+    def __init__(self, hook, root: int, offsets: tuple[int, ...] = (0,)) -> None:
+        self.hook = hook
+        self.root = root
+        # every offset but the last is dereferenced
+        self.offsets = offsets
+        self.root_value = None
+        self.address = None
+
+    def invalidate(self) -> None:
+        """Force the chain to be re-resolved"""
+        self.root_value = None
+        self.address = None
+
+    def resolve(self) -> int:
+        """Address at the end of the chain"""
+        root_value = self.hook.read_uint(self.root, 4)
+        if root_value != self.root_value:
+            address = root_value
+            for offset in self.offsets[:-1]:
+                address = self.hook.read_uint(address + offset, 4)
+            self.address = address + self.offsets[-1]
+            self.root_value = root_value
+        return self.address
+
+    def read_bytes(self, offset: int, length: int) -> bytes:
+        """Read bytes relative to the end of the chain"""
+        return self.hook.read_bytes(self.resolve() + offset, length)
+
+    def read_struct(self, offset: int, schema: str):
+        """Read struct relative to the end of the chain"""
+        return self.hook.read_struct(self.resolve() + offset, schema)
+
+    def read_uint(self, offset: int, length: int) -> int:
+        """Read unsigned integer relative to the end of the chain"""
+        return self.hook.read_uint(self.resolve() + offset, length)
@@ -0,0 +1,271 @@
+"""Class for reading emulator memory through a socket
+
+Protocol (little endian), every message starts with a u8 type and a u32 sequence:
+    client read request:      type 1, sequence, u32 range count, (u32 address, u32 length) per range
+    client subscribe request: type 2, sequence, u32 range count, (u32 address, u32 length) per range
+    server read reply:        type 1, sequence of the request, u32 length, the ranges' bytes
+    server snapshot:          type 2, sequence of the subscription, u32 length, the ranges' bytes
+
+The mGBA script can only run from emulator callbacks, so read replies arrive at
+the end of the next emulated frame (up to ~16.7ms) and not at all while paused.
+Ranges that are read every frame are subscribed to instead: the script pushes
+one snapshot of them per frame and reads are served from the latest snapshot
+without a round trip. Replies to reads that already timed out are recognised by
+their sequence number and dropped.
+"""
+
+import itertools
+import logging
+import socket
+import struct
+import threading
+import time
+
+from .backend import MemoryBackend
+from .hook import Hook
+from ..exceptions import AddressOutOfRange, EmulatorNotResponding
+
+MESSAGE_HEADER = struct.Struct("<BI")
+REQUEST_COUNT = struct.Struct("<I")
+REQUEST_RANGE = struct.Struct("<II")
+RESPONSE_LENGTH = struct.Struct("<I")
+
+READ = 1
+SUBSCRIBE = 2
+# server message types
+REPLY = 1
+SNAPSHOT = 2
+
+
+def recv_exact(connection: socket.socket, length: int) -> bytes:
+    """Receive exactly length bytes"""
+    buf = bytearray(length)
+    view = memoryview(buf)
+    received = 0
+    while received < length:
+        count = connection.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError("Socket closed")
+        received += count
+    return bytes(buf)
+
+
+def pack_request(message_type: int, sequence: int, ranges: list[tuple[int, int]]) -> bytes:
+    """Encode a read or subscribe request"""
+    request = bytearray(MESSAGE_HEADER.pack(message_type, sequence))
+    request += REQUEST_COUNT.pack(len(ranges))
+    for address, length in ranges:
+        request += REQUEST_RANGE.pack(address, length)
+    return bytes(request)
+
+
+def split_ranges(data: bytes, ranges: list[tuple[int, int]]) -> list[bytes]:
+    """Split back to back range data"""
+    results = []
+    offset = 0
+    for _, length in ranges:
+        results.append(data[offset:offset + length])
+        offset += length
+    return results
+
+
+class SocketBackend(MemoryBackend):
+    """Reads over one persistent socket
+
+    A receiver thread owns the receiving side: read replies are handed to the
+    waiting caller by sequence number and snapshots replace the latest one, so
+    any thread can read without replies getting mixed up
+    """
+
+    name = "socket"
+
+    # several frames, longer means the render loop stalls longer while paused
+    READ_TIMEOUT = 0.1
+    # seconds to fail reads immediately after a timeout before sending another
+    RETRY_INTERVAL = 0.5
+
+    def __init__(self, host: str, port: int, timeout: float = 1.0) -> None:
+        try:
+            self.connection = socket.create_connection((host, port), timeout=timeout)
+        except TimeoutError:
+            raise EmulatorNotResponding(f"Connecting to {host}:{port} timed out") from None
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # the receiver thread blocks until data arrives, timeouts are per request
+        self.connection.settimeout(None)
+        self.send_lock = threading.Lock()
+        self.condition = threading.Condition()
+        self.sequences = itertools.count(1)
+        # sequences of requests still being waited on, and their replies
+        self.waiting: set[int] = set()
+        self.replies: dict[int, bytes] = {}
+        # (sequence, ranges as (address, length, offset in snapshot))
+        self.subscription: tuple[int, list[tuple[int, int, int]]] | None = None
+        # (subscription sequence, data)
+        self.snapshot: tuple[int, bytes] | None = None
+        self.stalled_until = 0.0
+        self.error: Exception | None = None
+        self.receiver = threading.Thread(target=self.receive, daemon=True)
+        self.receiver.start()
+
+    def next_sequence(self) -> int:
+        """Sequence number for a new request"""
+        return next(self.sequences) & 0xFFFFFFFF
+
+    def send(self, request: bytes) -> None:
+        """Send a whole request"""
+        with self.send_lock:
+            self.connection.sendall(request)
+
+    def receive(self) -> None:
+        """Receiver thread"""
+        try:
+            while True:
+                message_type, sequence = MESSAGE_HEADER.unpack(
+                    recv_exact(self.connection, MESSAGE_HEADER.size)
+                )
+                (length,) = RESPONSE_LENGTH.unpack(recv_exact(self.connection, RESPONSE_LENGTH.size))
+                data = recv_exact(self.connection, length)
+                with self.condition:
+                    # anything arriving means the emulator is running again
+                    self.stalled_until = 0.0
+                    if message_type == REPLY:
+                        if sequence in self.waiting:
+                            self.replies[sequence] = data
+                            self.condition.notify_all()
+                    elif message_type == SNAPSHOT:
+                        self.snapshot = (sequence, data)
+        except OSError as error:
+            with self.condition:
+                self.error = error
+                self.condition.notify_all()
+
+    def check_connection(self) -> None:
+        """Raise if the receiver has stopped"""
+        if self.error is not None:
+            raise ConnectionError(f"Socket closed ({self.error})")
+
+    def read(self, address: int, length: int) -> bytes:
+        return self.read_many(((address, length),))[0]
+
+    def read_many(self, ranges: list[tuple[int, int]]) -> list[bytes]:
+        with self.condition:
+            self.check_connection()
+            if time.perf_counter() < self.stalled_until:
+                raise EmulatorNotResponding("Emulator is not answering reads")
+            sequence = self.next_sequence()
+            self.waiting.add(sequence)
+        try:
+            self.send(pack_request(READ, sequence, ranges))
+            with self.condition:
+                self.condition.wait_for(
+                    lambda: sequence in self.replies or self.error is not None,
+                    self.READ_TIMEOUT
+                )
+                data = self.replies.pop(sequence, None)
+                if data is None:
+                    self.check_connection()
+                    # the late reply is dropped by sequence when it arrives
+                    self.stalled_until = time.perf_counter() + self.RETRY_INTERVAL
+                    raise EmulatorNotResponding("Emulator is not answering reads")
+        finally:
+            with self.condition:
+                self.waiting.discard(sequence)
+        if len(data) != sum(length for _, length in ranges):
+            raise OSError(f"Unexpected response length {len(data)}")
+        return split_ranges(data, ranges)
+
+    def subscribe(self, ranges: list[tuple[int, int]]) -> None:
+        """Have the server push these ranges every frame, replacing the previous subscription"""
+        ranges = list(ranges)
+        if self.subscription is not None and [
+            (address, length) for address, length, _ in self.subscription[1]
+        ] == ranges:
+            return
+        self.check_connection()
+        sequence = self.next_sequence()
+        offsets = itertools.accumulate((length for _, length in ranges), initial=0)
+        with self.condition:
+            self.subscription = (
+                sequence,
+                [(address, length, offset) for (address, length), offset in zip(ranges, offsets)]
+            )
+        self.send(pack_request(SUBSCRIBE, sequence, ranges))
+
+    def latest(self, address: int, length: int) -> bytes | None:
+        """Bytes from the newest snapshot of the current subscription, None if not covered"""
+        with self.condition:
+            self.check_connection()
+            if self.snapshot is None or self.subscription is None:
+                return None
+            sequence, data = self.snapshot
+            subscription_sequence, ranges = self.subscription
+        if sequence != subscription_sequence:
+            return None
+        for start, range_length, offset in ranges:
+            if start <= address and address + length <= start + range_length:
+                offset += address - start
+                return data[offset:offset + length]
+        return None
+
+    def close(self) -> None:
+        self.error = self.error or ConnectionError("Closed")
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.connection.close()
+
+
+class SocketHook(Hook):
+    """Hook reading GBA memory from a script running inside the emulator"""
+
+    DEFAULT_PORT = 8888
+
+    def hook(self, port: int = DEFAULT_PORT, host: str = "127.0.0.1") -> None:
+        """Connect to the read server listening on host:port"""
+        self.detach()
+        try:
+            self.backend = SocketBackend(host, port)
+        except (OSError, EmulatorNotResponding) as error:
+            logging.error(f"Error: Could not connect to {host}:{port} ({error})")
+            return
+        self.backend_throughput = {}
+        self.detect_memory_bases()
+
+    def detect_memory_bases(self) -> None:
+        logging.info("Connected successfully")
+        self.is_initialized = True
+
+    def convert_address(self, address: int) -> int:
+        """Validate address, the server reads GBA addresses directly"""
+        if 0x2000000 <= address < 0x2040000 or 0x3000000 <= address < 0x3008000:
+            return address
+        raise AddressOutOfRange(f"Address {address:X} out of range")
+
+    def read_bytes(self, address: int, length: int, cached: bool = True) -> bytes:
+        """Read bytes at specified address
+
+        Reads inside a prefetched range are served from the prefetch unless cached
+        is False, then from the newest snapshot, and only otherwise requested
+        """
+        if cached:
+            for start, data in self.prefetched:
+                if start <= address and address + length <= start + len(data):
+                    return data[address - start:address - start + length]
+        data = self.backend.latest(self.convert_address(address), length)
+        if data is not None:
+            return data
+        return self.backend.read(self.convert_address(address), length)
+
+    def prefetch(self, ranges: list[tuple[int, int]]) -> None:
+        """Subscribe to ranges and pin the newest snapshot of them for this frame
+
+        Falls back to one batched read until the first snapshot of a new
+        subscription arrives
+        """
+        ranges = [(self.convert_address(address), length) for address, length in ranges]
+        self.backend.subscribe(ranges)
+        parts = [self.backend.latest(address, length) for address, length in ranges]
+        if None in parts:
+            parts = self.backend.read_many(ranges)
+        self.prefetched = list(zip((address for address, _ in ranges), parts))
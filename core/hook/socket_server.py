@@ -0,0 +1,143 @@
+"""Local stand-in for the in-emulator read server
+
+Serves the SocketHook protocol from in-memory regions so the socket hook can be
+exercised without an emulator. frame() plays the part of the emulator's frame
+callback and pause()/resume() hold back replies the way a paused emulator does
+"""
+
+import socket
+import socketserver
+import threading
+
+from .socket_hook import (
+    MESSAGE_HEADER,
+    REQUEST_COUNT,
+    REQUEST_RANGE,
+    RESPONSE_LENGTH,
+    READ,
+    SUBSCRIBE,
+    REPLY,
+    SNAPSHOT,
+    recv_exact,
+)
+
+
+class ReadRequestHandler(socketserver.BaseRequestHandler):
+    """Answer requests until the client disconnects"""
+
+    def setup(self) -> None:
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.send_lock = threading.Lock()
+        # (sequence, ranges)
+        self.subscription = None
+        with self.server.lock:
+            self.server.handlers.add(self)
+
+    def finish(self) -> None:
+        with self.server.lock:
+            self.server.handlers.discard(self)
+
+    def send(self, message_type: int, sequence: int, data: bytes) -> None:
+        """Send one message"""
+        with self.send_lock:
+            self.request.sendall(
+                MESSAGE_HEADER.pack(message_type, sequence) + RESPONSE_LENGTH.pack(len(data)) + data
+            )
+
+    def send_snapshot(self) -> None:
+        """Push the subscribed ranges"""
+        subscription = self.subscription
+        if subscription is None:
+            return
+        sequence, ranges = subscription
+        self.send(SNAPSHOT, sequence, self.server.read_ranges(ranges))
+
+    def handle(self) -> None:
+        try:
+            while True:
+                message_type, sequence = MESSAGE_HEADER.unpack(
+                    recv_exact(self.request, MESSAGE_HEADER.size)
+                )
+                (count,) = REQUEST_COUNT.unpack(recv_exact(self.request, REQUEST_COUNT.size))
+                ranges = list(
+                    REQUEST_RANGE.iter_unpack(recv_exact(self.request, count * REQUEST_RANGE.size))
+                )
+                # a paused emulator answers nothing until it resumes
+                self.server.running.wait()
+                if message_type == READ:
+                    self.send(REPLY, sequence, self.server.read_ranges(ranges))
+                elif message_type == SUBSCRIBE:
+                    self.subscription = (sequence, ranges) if ranges else None
+        except OSError:
+            pass
+
+
+class LocalReadServer(socketserver.ThreadingTCPServer):
+    """Read server backed by {base address: bytearray} regions"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, regions: dict[int, bytearray], host: str = "127.0.0.1", port: int = 0) -> None:
+        self.regions = regions
+        self.lock = threading.Lock()
+        self.handlers: set[ReadRequestHandler] = set()
+        self.running = threading.Event()
+        self.running.set()
+        super().__init__((host, port), ReadRequestHandler)
+        self.thread = None
+
+    @property
+    def port(self) -> int:
+        """Port the server is listening on"""
+        return self.server_address[1]
+
+    def read(self, address: int, length: int) -> bytes:
+        """Read from the region containing address, zero filled outside of regions"""
+        for base, region in self.regions.items():
+            if base <= address and address + length <= base + len(region):
+                return bytes(region[address - base:address - base + length])
+        return bytes(length)
+
+    def read_ranges(self, ranges: list[tuple[int, int]]) -> bytes:
+        """Ranges back to back"""
+        return b"".join(self.read(address, length) for address, length in ranges)
+
+    def frame(self) -> None:
+        """Push a snapshot to every subscribed client, like the end of an emulated frame"""
+        if not self.running.is_set():
+            return
+        with self.lock:
+            handlers = list(self.handlers)
+        for handler in handlers:
+            try:
+                handler.send_snapshot()
+            except OSError:
+                pass
+
+    def pause(self) -> None:
+        """Stop answering requests"""
+        self.running.clear()
+
+    def resume(self) -> None:
+        """Answer held back requests and continue"""
+        self.running.set()
+
+    def start(self) -> "LocalReadServer":
+        """Serve on a background thread"""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop serving and drop connected clients"""
+        self.running.set()
+        self.shutdown()
+        with self.lock:
+            handlers = list(self.handlers)
+        for handler in handlers:
+            try:
+                handler.request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.server_close()
@@ -1,13 +1,26 @@
 """GBA RNG Instance"""
 
 from enum import IntEnum
+import json
+from typing import Callable
 import logging
 import dearpygui.dearpygui as dpg
 from numba_pokemon_prngs.data import SPECIES_EN
 
 from ..hook.mgba_hook import MGBAHook
-from ..util import lcrng_distance, load_sprite
+from ..util import load_sprite, NATURES
 from ..pkm.pk3 import PK3
+from ..rng import LCRNG
+from ..timer import AdvanceTimer, GBA_FPS
+from ..session_log import SessionLogger
+from ..rom import RomData, EncounterType, FishingRod, slot_from_rand
+from ..search.tid_sid import search_shards
+from ..search.shiny_index import ShinyIndex, index_shards, scan_shard
+from ..scanner import MemoryScanner
+from ..widgets import VirtualTable, Method1DataSource
+from ..generator import IV_FIELDS
+from ..sampler import FrameSampler
+from ..jobs import JobExecutor
 
 class GBA:
     """GBA RNG Instance"""
@@ -26,6 +39,24 @@ class GBA:
     RSE = (GameVersion.RUBY, GameVersion.SAPPHIRE, GameVersion.EMERALD)
     RS = (GameVersion.RUBY, GameVersion.SAPPHIRE)
 
+    # reads of a pk3 before giving up on a torn struct
+    PK3_READ_ATTEMPTS = 3
+    # advances to walk back when looking for the seed a wild pid came from
+    PID_SEARCH_RANGE = 1000
+    SESSION_LOG_PATH = "sessions.db"
+    ADDRESS_OVERRIDES_PATH = "address_overrides.json"
+    OVERRIDABLE_ADDRESSES = (
+        "current_seed_addr",
+        "initial_seed_addr",
+        "party_addr",
+        "wild_addr",
+        "vframe_addr",
+        "id_addr",
+        "sav1_addr",
+        "sav2_addr",
+        "location_addr",
+    )
+
     class GameLanguage(IntEnum):
         """Gen 3 game langauge"""
         EUR = 0
@@ -37,20 +68,46 @@ class GBA:
             return cls.EUR
 
     def __init__(self, rom_file_path: str) -> None:
-        with open(rom_file_path, "rb") as rom_file:
-            self.rom_file_data = rom_file.read(0x100)
+        self.rom = RomData(rom_file_path)
+        self.rom_file_data = self.rom.rom[:0x100]
         self.game_version = self.GameVersion(self.rom_file_data[0xAE])
         self.game_language = self.GameLanguage(self.rom_file_data[0xAF])
         self.game_revision = self.rom_file_data[0xBC]
         logging.info(
             f"Detected {self.game_language.name} {self.game_version.name} rev-{self.game_revision}"
         )
+        self.rng = LCRNG
         self.get_addresses()
+        self.apply_address_overrides()
+        self.current_seed = self.initial_seed
+        self.current_advance = 0
+        self.target_advance = None
+        self.timer = None
+        self.tid = self.sid = None
         self.hook = MGBAHook()
+        self.jobs = JobExecutor()
+        self.sampler = FrameSampler(self.read_frame if self.vframe_addr is not None else None)
+        self.session_log = SessionLogger(
+            self.SESSION_LOG_PATH,
+            f"{self.game_language.name} {self.game_version.name} rev-{self.game_revision}"
+        )
+
+    def close(self) -> None:
+        """Stop background work"""
+        if self.timer is not None:
+            self.timer.stop()
+        self.jobs.shutdown()
+        self.session_log.close()
+        self.rom.close()
 
     def get_windows(self):
-        """Set up windows and get update functions"""
-        return (
+        """Set up windows and get update functions, windows without one return None
+
+        Returns (memory updates, ui updates): memory updates read from the hook
+        and only need to run on a new emulated frame, ui updates show local
+        state and run every render frame
+        """
+        memory_windows = (
             self.rng_info_window(),
             self.trainer_info_window(),
             self.party_info_window(0),
@@ -60,7 +117,50 @@ class GBA:
             self.party_info_window(4),
             self.party_info_window(5),
             self.wild_info_window(),
+            self.encounter_slot_window(),
+            self.memory_scanner_window(),
+        )
+        ui_windows = (
+            self.timer_window(),
+            self.tid_seed_search_window(),
+            self.shiny_finder_window(),
+            self.advance_table_window(),
         )
+        return (
+            tuple(window_update for window_update in memory_windows if window_update is not None),
+            tuple(window_update for window_update in ui_windows if window_update is not None),
+        )
+
+    def read_frame(self) -> int:
+        """Emulator vframe counter, never from the previous prefetch"""
+        return int.from_bytes(self.hook.read_bytes(self.vframe_addr, 4, cached=False), "little")
+
+    def prefetch(self):
+        """Batch every read the memory windows make each frame into one backend call"""
+        ranges = [
+            (self.party_addr, 6 * 0x64),
+            (self.wild_addr, 0x50),
+            (self.current_seed_addr, 4),
+        ]
+        if self.initial_seed_addr is not None:
+            ranges.append((self.initial_seed_addr, 2))
+        if self.vframe_addr is not None:
+            ranges.append((self.vframe_addr, 4))
+        if self.id_addr is not None:
+            ranges.append((self.id_addr, 4))
+        elif self.sav2_addr is not None:
+            ranges.append((self.sav2_addr, 4))
+            chain = self.hook.pointer_chain(self.sav2_addr)
+            if chain.address is not None:
+                ranges.append((chain.address + 0xA, 4))
+        if self.location_addr is not None:
+            ranges.append((self.location_addr, 2))
+        elif self.sav1_addr is not None:
+            ranges.append((self.sav1_addr, 4))
+            chain = self.hook.pointer_chain(self.sav1_addr)
+            if chain.address is not None:
+                ranges.append((chain.address + 4, 2))
+        self.hook.prefetch(ranges)
 
     def get_addresses(self):
         """Get ram addresses based on game and language"""
@@ -72,6 +172,8 @@ class GBA:
                 self.initial_seed_addr = None
                 # TODO: add sav2 address when its needed
                 self.sav2_addr = None
+                # save blocks are static in RS
+                self.sav1_addr = None
                 match self.game_language:
                     case self.GameLanguage.JPN:
                         self.current_seed_addr = 0x03004748
@@ -79,68 +181,122 @@ class GBA:
                         self.wild_addr = 0x030044F0
                         self.id_addr = 0x02024C0E
                         self.vframe_addr = 0x03001790
+                        # TODO: find JPN sav1 address
+                        self.location_addr = None
                     case self.GameLanguage.USA:
                         self.current_seed_addr = 0x03004818
                         self.party_addr = 0x03004360
                         self.wild_addr = 0x030045C0
                         self.id_addr = 0x02024EAE
                         self.vframe_addr = 0x03001790
+                        self.location_addr = 0x02025734 + 4
                     case self.GameLanguage.EUR:
                         self.current_seed_addr = 0x03004828
                         self.party_addr = 0x03004370
                         self.wild_addr = 0x030045D0
                         self.id_addr = 0x02024EAE
                         self.vframe_addr = 0x03001790
+                        self.location_addr = 0x02025734 + 4
             case self.GameVersion.FIRERED | self.GameVersion.LEAFGREEN:
                 self.initial_seed = 0
                 self.initial_seed_addr = 0x02020000
                 self.id_addr = None
+                self.location_addr = None
                 self.vframe_addr = None
                 match self.game_language:
                     case self.GameLanguage.JPN:
                         if self.game_revision == 1:
                             self.current_seed_addr = 0x03004FA0
                             self.sav2_addr = 0x03004FAC
+                            self.sav1_addr = 0x03004FA8
                         else:
                             self.current_seed_addr = 0x03005040
                             self.sav2_addr = 0x0300504C
+                            self.sav1_addr = 0x03005048
                         self.party_addr = 0x020241E4
                         self.wild_addr = 0x02023F8C
                     case self.GameLanguage.USA:
                         self.current_seed_addr = 0x03005000
                         self.sav2_addr = 0x0300500C
+                        self.sav1_addr = 0x03005008
                         self.party_addr = 0x02024284
                         self.wild_addr = 0x0202402C
                     case self.GameLanguage.EUR:
                         self.current_seed_addr = 0x03004F50
                         self.sav2_addr = 0x03004F5C
+                        self.sav1_addr = 0x03004F58
                         self.party_addr = 0x02024284
                         self.wild_addr = 0x0202402C
             case self.GameVersion.EMERALD:
                 self.initial_seed = 0
                 self.initial_seed_addr = 0x02020000
                 self.id_addr = None
+                self.location_addr = None
                 match self.game_language:
                     case self.GameLanguage.JPN:
                         self.current_seed_addr = 0x03005AE0
                         self.party_addr = 0x02024190
                         self.wild_addr = 0x020243E8
                         self.sav2_addr = 0x03005AF0
+                        self.sav1_addr = 0x03005AEC
                         self.vframe_addr = 0x03002384
                     case self.GameLanguage.USA | self.GameLanguage.EUR:
                         self.current_seed_addr = 0x03005D80
                         self.party_addr = 0x020244EC
                         self.wild_addr = 0x02024744
                         self.sav2_addr = 0x03005D90
+                        self.sav1_addr = 0x03005D8C
                         self.vframe_addr = 0x030022E4
 
+    @property
+    def rom_key(self) -> str:
+        """Hash identifying the exact ROM, hacks usually keep the vanilla game code"""
+        return self.rom.sha1
+
+    @property
+    def rom_label(self) -> str:
+        """Game code and revision, only stored to make the overrides file readable"""
+        return f"{self.rom_file_data[0xAC:0xB0].decode('ascii', 'replace')}-{self.game_revision}"
+
+    def load_address_overrides(self) -> dict[str, dict]:
+        """All saved address overrides, {rom hash: {"label": str, "addresses": {name: address}}}"""
+        try:
+            with open(self.ADDRESS_OVERRIDES_PATH, "r", encoding="utf-8") as overrides_file:
+                return json.load(overrides_file)
+        except FileNotFoundError:
+            return {}
+
+    def apply_address_overrides(self):
+        """Replace ram addresses with the ones saved for this ROM"""
+        overrides = self.load_address_overrides().get(self.rom_key, {})
+        for name, address in overrides.get("addresses", {}).items():
+            if name in self.OVERRIDABLE_ADDRESSES:
+                logging.info(f"Using {name} override {address:08X}")
+                setattr(self, name, address)
+
+    def save_address_override(self, name: str, address: int):
+        """Save and apply a ram address override for this ROM"""
+        overrides = self.load_address_overrides()
+        rom_overrides = overrides.setdefault(self.rom_key, {"addresses": {}})
+        rom_overrides["label"] = self.rom_label
+        rom_overrides.setdefault("addresses", {})[name] = address
+        with open(self.ADDRESS_OVERRIDES_PATH, "w", encoding="utf-8") as overrides_file:
+            json.dump(overrides, overrides_file, indent=4)
+        setattr(self, name, address)
+
     def rng_info_window(self):
         """RNG seed info"""
 
         def detect_tid_seed():
             self.initial_seed = self.hook.read_uint(self.initial_seed_addr, 2)
 
-        with dpg.window(label="RNG Info", width=240, height=150, no_close=True, pos=[1, 100 + 25]):
+        def calculate_seed():
+            seed = int(dpg.get_value(calc_seed_input) or "0", 16) & 0xFFFFFFFF
+            advances = dpg.get_value(calc_advances_input)
+            dpg.set_value(calc_forward_label, f"Forward: {self.rng.advance(seed, advances):08X}")
+            dpg.set_value(calc_back_label, f"Back: {self.rng.jump_back(seed, advances):08X}")
+
+        with dpg.window(label="RNG Info", width=240, height=170, no_close=True, pos=[1, 100 + 25]):
             if self.game_version in self.RSE:
                 detect_tid_seed = dpg.add_button(label="Detect TID Seed", callback=detect_tid_seed)
             initial_seed_label = dpg.add_text("Initial Seed:")
@@ -148,13 +304,30 @@ class GBA:
             current_advance_label = dpg.add_text("Current Advance:")
             if self.game_version in self.RSE:
                 painting_timer_label = dpg.add_text("Painting Timer:")
+            sampling_label = dpg.add_text("")
+            with dpg.collapsing_header(label="Seed Calculator"):
+                calc_seed_input = dpg.add_input_text(
+                    label="Seed", hexadecimal=True, default_value="0", callback=calculate_seed
+                )
+                calc_advances_input = dpg.add_input_int(
+                    label="Advances", min_value=0, min_clamped=True, callback=calculate_seed
+                )
+                calc_forward_label = dpg.add_text("Forward:")
+                calc_back_label = dpg.add_text("Back:")
+
+        logged_initial_seed = None
 
         def update():
-            current_seed = self.hook.read_uint(self.current_seed_addr, 4)
+            nonlocal logged_initial_seed
+            current_seed = self.current_seed = self.hook.read_uint(self.current_seed_addr, 4)
             if self.game_version not in self.RSE:
                 self.initial_seed = self.hook.read_uint(self.initial_seed_addr, 2)
             if self.vframe_addr is not None:
-                vframe = self.hook.read_uint(self.vframe_addr, 4)
+                # the sampler already read this frame's vframe when it is active
+                if self.sampler.enabled and self.sampler.last_frame is not None:
+                    vframe = self.sampler.last_frame
+                else:
+                    vframe = self.hook.read_uint(self.vframe_addr, 4)
                 # only 2 bytes used for reseeding
                 painting_timer = vframe & 0xFFFF
                 dpg.set_value(painting_timer_label, f"Painting Timer: {painting_timer:04X}")
@@ -165,14 +338,51 @@ class GBA:
                 # painting_timer == current_seed on painting reseed or rare false positive
                 if painting_timer == current_seed:
                     self.initial_seed = self.hook.read_uint(self.current_seed_addr, 4)
-            current_advance = lcrng_distance(self.initial_seed, current_seed)
+            current_advance = self.current_advance = self.rng.distance(self.initial_seed, current_seed)
             dpg.set_value(initial_seed_label, f"Initial Seed: {self.initial_seed:08X}")
             dpg.set_value(current_seed_label, f"Current Seed: {current_seed:08X}")
             dpg.set_value(current_advance_label, f"Current Advance: {current_advance}")
+            if self.sampler.read_frame is not None and self.sampler.enabled:
+                dpg.set_value(
+                    sampling_label,
+                    f"Skipped Frames: {self.sampler.skipped_frames}"
+                    + (f" (+{self.sampler.last_skip})" if self.sampler.last_skip else "")
+                    + (" Paused" if self.sampler.paused else "")
+                )
+            if self.initial_seed != logged_initial_seed:
+                self.session_log.log_reseed(self.initial_seed)
+                logged_initial_seed = self.initial_seed
 
         return update
 
-    def pokemon_info_window(self, address: int, title: str, pos: list[int, int] = None):
+    def read_pk3(self, address: int) -> PK3 | None:
+        """Read a PK3, re-reading only if it was caught mid-write"""
+        for attempt in range(self.PK3_READ_ATTEMPTS):
+            # retries must not be served from the prefetch
+            pk3 = PK3(self.hook.read_bytes(address, 0x50, cached=attempt == 0))
+            if pk3.is_valid:
+                return pk3
+        logging.debug(f"Checksum mismatch reading PK3 at {address:08X}")
+        return None
+
+    def find_pid_seed(self, pid: int) -> int | None:
+        """Walk back from the current seed to the seed a pid was generated from"""
+        reverse = self.rng.reverse
+        seed = self.current_seed
+        for _ in range(self.PID_SEARCH_RANGE):
+            prev = reverse.next(seed)
+            if (seed & 0xFFFF0000) | (prev >> 16) == pid:
+                return reverse.next(prev)
+            seed = prev
+        return None
+
+    def pokemon_info_window(
+        self,
+        address: int,
+        title: str,
+        pos: list[int, int] = None,
+        on_change: Callable[[PK3], None] = None,
+    ):
         """Pokemon summary info"""
 
         with dpg.window(label=title, width=240, pos=pos or [], no_close=True):
@@ -181,8 +391,22 @@ class GBA:
             pid_label = dpg.add_text("PID:")
             iv_label = dpg.add_text("IVs:")
 
+        last_pid = None
+        last_backend = None
+
         def update():
-            pk3 = PK3(self.hook.read_bytes(address, 0x50))
+            nonlocal last_pid, last_backend
+            pk3 = self.read_pk3(address)
+            # keep showing the last consistent read
+            if pk3 is None:
+                return
+            if self.hook.backend is not last_backend:
+                # first read since hooking shows what was already there, not a change
+                last_backend = self.hook.backend
+                last_pid = pk3.pid
+            elif on_change is not None and pk3.pid != last_pid:
+                on_change(pk3)
+                last_pid = pk3.pid
             dpg.configure_item(species_image, texture_tag=load_sprite(pk3.species, 0, pk3.shiny))
             dpg.set_value(species_label, SPECIES_EN[pk3.species])
             dpg.set_value(pid_label, f"PID: {pk3.pid:08X}")
@@ -192,18 +416,41 @@ class GBA:
 
     def party_info_window(self, party_slot: int):
         """Party pokemon info"""
+
+        def on_change(pk3: PK3):
+            self.session_log.log_party_change(party_slot, pk3.pid, pk3.species)
+
         return self.pokemon_info_window(
             self.party_addr + party_slot * 0x64,
             f"Party {party_slot + 1}",
-            [800 - (240 * (2 - (party_slot // 3))), 160 * (party_slot % 3)]
+            [800 - (240 * (2 - (party_slot // 3))), 160 * (party_slot % 3)],
+            on_change,
         )
 
     def wild_info_window(self):
         """Wild pokemon info"""
+
+        def on_change(pk3: PK3):
+            # empty wild slot between battles
+            if pk3.pid == 0 and pk3.species == 0:
+                return
+            pid_seed = self.find_pid_seed(pk3.pid)
+            self.session_log.log_encounter(
+                pk3.pid,
+                pk3.iv32,
+                pk3.species,
+                pk3.shiny,
+                self.initial_seed,
+                pid_seed,
+                None if pid_seed is None else self.rng.distance(self.initial_seed, pid_seed),
+                self.target_advance,
+            )
+
         return self.pokemon_info_window(
             self.wild_addr,
             "Wild",
-            [1, 201 + 25 + 25 + 25]
+            [1, 201 + 25 + 25 + 25],
+            on_change,
         )
 
     def trainer_info_window(self):
@@ -213,10 +460,375 @@ class GBA:
             tid_sid_label = dpg.add_text("TID/SID:")
 
         def update():
-            id_addr = self.id_addr
-            if id_addr is None:
-                id_addr = self.hook.read_uint(self.sav2_addr, 4) + 0xA 
-            tid, sid = self.hook.read_uint(id_addr, 2), self.hook.read_uint(id_addr + 2, 2)
+            if self.id_addr is None:
+                tid, sid = self.hook.pointer_chain(self.sav2_addr).read_struct(0xA, "<HH")
+            else:
+                tid, sid = self.hook.read_struct(self.id_addr, "<HH")
+            self.tid, self.sid = tid, sid
             dpg.set_value(tid_sid_label, f"TID/SID: {tid}/{sid}")
 
         return update
+
+    def timer_window(self):
+        """Target advance timer"""
+
+        def read_advance():
+            return self.rng.distance(
+                self.initial_seed,
+                int.from_bytes(self.hook.read_bytes(self.current_seed_addr, 4, cached=False), "little")
+            )
+
+        self.timer = AdvanceTimer(
+            read_advance,
+            self.read_frame if self.vframe_addr is not None else None
+        )
+
+        def start_timer():
+            if not self.hook.is_initialized:
+                logging.warning("Hook a process before starting the timer")
+                return
+            self.target_advance = dpg.get_value(target_input)
+            self.timer.start(self.target_advance)
+
+        with dpg.window(label="Timer", width=240, no_close=True, pos=[241, 500]):
+            target_input = dpg.add_input_int(label="Target", min_value=0, min_clamped=True)
+            with dpg.group(horizontal=True):
+                dpg.add_button(label="Start", callback=start_timer)
+                dpg.add_button(label="Stop", callback=lambda: self.timer.stop())
+            remaining_label = dpg.add_text("Frames Remaining:")
+            rate_label = dpg.add_text("Advances/Frame:")
+            cue_label = dpg.add_text("")
+
+        def update():
+            frames_remaining = self.timer.frames_remaining
+            if frames_remaining is None:
+                dpg.set_value(remaining_label, "Frames Remaining:")
+            else:
+                dpg.set_value(
+                    remaining_label,
+                    f"Frames Remaining: {frames_remaining} ({frames_remaining / GBA_FPS:.2f}s)"
+                )
+            dpg.set_value(rate_label, f"Advances/Frame: {self.timer.advance_rate:.2f}")
+            if self.timer.last_cue is None:
+                dpg.set_value(cue_label, "")
+            else:
+                cue_frames, _ = self.timer.last_cue
+                dpg.set_value(cue_label, "PRESS A" if cue_frames == 0 else f"Cue: {cue_frames}")
+
+        return update
+
+    def read_location(self) -> tuple[int, int] | None:
+        """Current (map group, map num)"""
+        if self.location_addr is not None:
+            map_group, map_num = self.hook.read_struct(self.location_addr, "<BB")
+        elif self.sav1_addr is not None:
+            map_group, map_num = self.hook.pointer_chain(self.sav1_addr).read_struct(4, "<BB")
+        else:
+            return None
+        return map_group, map_num
+
+    def encounter_slot_window(self):
+        """Predicted wild encounter slots"""
+
+        encounter_methods = {
+            "Grass/Cave": (EncounterType.LAND, None),
+            "Surfing": (EncounterType.WATER, None),
+            "Rock Smash": (EncounterType.ROCK_SMASH, None),
+            "Old Rod": (EncounterType.FISHING, FishingRod.OLD),
+            "Good Rod": (EncounterType.FISHING, FishingRod.GOOD),
+            "Super Rod": (EncounterType.FISHING, FishingRod.SUPER),
+        }
+        prediction_count = 8
+
+        with dpg.window(label="Encounter Slots", width=240, no_close=True, pos=[481, 500]):
+            method_combo = dpg.add_combo(
+                list(encounter_methods),
+                default_value="Grass/Cave",
+                label="Method",
+            )
+            map_label = dpg.add_text("Map:")
+            prediction_labels = [dpg.add_text("") for _ in range(prediction_count)]
+
+        def update():
+            location = self.read_location()
+            if location is None:
+                dpg.set_value(map_label, "Map: Unknown")
+                return
+            dpg.set_value(map_label, f"Map: {location[0]}-{location[1]}")
+            encounter_type, rod = encounter_methods[dpg.get_value(method_combo)]
+            table = self.rom.encounter_table(*location, encounter_type)
+            if table is None:
+                for label in prediction_labels:
+                    dpg.set_value(label, "")
+                return
+            advance = self.rng.distance(self.initial_seed, self.current_seed)
+            seed = self.current_seed
+            for i, label in enumerate(prediction_labels):
+                slot_seed = self.rng.next(seed)
+                level_seed = self.rng.next(slot_seed)
+                slot = slot_from_rand(encounter_type, slot_seed >> 16, rod)
+                min_level, max_level = table.min_levels[slot], table.max_levels[slot]
+                level = min_level + (level_seed >> 16) % (max(max_level - min_level, 0) + 1)
+                dpg.set_value(
+                    label,
+                    f"{advance + i}: Slot {slot} {SPECIES_EN[table.species[slot]]} Lv. {level}"
+                )
+                seed = slot_seed
+
+        return update
+
+    def tid_seed_search_window(self):
+        """Initial seed search from TID/SID"""
+
+        search_job = None
+        progress = (0, 0)
+        results = []
+        shown_results = 0
+
+        def on_progress(done: int, total: int, new_results: list[tuple[int, int]]):
+            nonlocal progress
+            progress = (done, total)
+            results.extend(new_results)
+
+        def on_done(_shard_results):
+            results.sort()
+
+        def start_search():
+            nonlocal search_job, results, progress
+            if self.tid is None or (search_job is not None and not search_job.finished):
+                return
+            results = []
+            shard_function, shards = search_shards(
+                self.tid,
+                self.sid,
+                (
+                    int(dpg.get_value(seed_min_input) or "0", 16),
+                    int(dpg.get_value(seed_max_input) or "0", 16),
+                ),
+                (0, dpg.get_value(max_advance_input)),
+            )
+            progress = (0, len(shards))
+            search_job = self.jobs.submit(shard_function, shards, on_progress, on_done)
+
+        def cancel_search():
+            if search_job is not None:
+                self.jobs.cancel(search_job)
+
+        def select_result(_sender, app_data):
+            self.initial_seed = int(app_data.split(" ")[0], 16)
+
+        with dpg.window(label="TID Seed Search", width=240, no_close=True, pos=[721, 500]):
+            seed_min_input = dpg.add_input_text(label="Min Seed", hexadecimal=True, default_value="0")
+            seed_max_input = dpg.add_input_text(label="Max Seed", hexadecimal=True, default_value="FFFF")
+            max_advance_input = dpg.add_input_int(
+                label="Max Advance", default_value=100000, min_value=0, min_clamped=True
+            )
+            with dpg.group(horizontal=True):
+                dpg.add_button(label="Search", callback=start_search)
+                dpg.add_button(label="Cancel", callback=cancel_search)
+            progress_label = dpg.add_text("Progress:")
+            results_list = dpg.add_listbox([], num_items=5, callback=select_result)
+
+        def update():
+            nonlocal shown_results
+            done, total = progress
+            cancelled = " (Cancelled)" if search_job is not None and search_job.cancelled else ""
+            dpg.set_value(progress_label, f"Progress: {done}/{total}{cancelled}")
+            if len(results) != shown_results:
+                shown_results = len(results)
+                dpg.configure_item(
+                    results_list,
+                    items=[f"{seed:08X} @ {advance}" for seed, advance in results[:1000]]
+                )
+
+        return update
+
+    def shiny_finder_window(self):
+        """Next shiny advance from a cached full-period index"""
+
+        index = None
+        index_group = None
+        build_job = None
+        progress = (0, 0)
+
+        def on_progress(done: int, total: int, _shard_result):
+            nonlocal progress
+            progress = (done, total)
+
+        def build_index():
+            nonlocal build_job, progress
+            if self.tid is None or (build_job is not None and not build_job.finished):
+                return
+            tid, sid = self.tid, self.sid
+
+            def on_done(shard_results):
+                nonlocal index, index_group
+                index = ShinyIndex.from_shards(tid, sid, shard_results)
+                index_group = ShinyIndex.shiny_group(tid, sid)
+
+            shards = index_shards(ShinyIndex.shiny_group(tid, sid))
+            progress = (0, len(shards))
+            # behind interactive searches
+            build_job = self.jobs.submit(scan_shard, shards, on_progress, on_done, priority=1)
+
+        def cancel_build():
+            if build_job is not None:
+                self.jobs.cancel(build_job)
+
+        with dpg.window(label="Shiny Finder", width=240, no_close=True, pos=[721, 300], collapsed=True):
+            with dpg.group(horizontal=True):
+                dpg.add_button(label="Build Index", callback=build_index)
+                dpg.add_button(label="Cancel", callback=cancel_build)
+            progress_label = dpg.add_text("Index:")
+            next_shiny_label = dpg.add_text("Next Shiny:")
+
+        def update():
+            nonlocal index, index_group
+            if self.tid is None:
+                dpg.set_value(progress_label, "Index: No Trainer")
+                dpg.set_value(next_shiny_label, "Next Shiny:")
+                return
+            shiny_group = ShinyIndex.shiny_group(self.tid, self.sid)
+            if build_job is not None and not build_job.finished:
+                done, total = progress
+                dpg.set_value(progress_label, f"Index: Building {done}/{total}")
+                return
+            if index_group != shiny_group:
+                index = ShinyIndex.load(self.tid, self.sid)
+                index_group = shiny_group
+            if index is None:
+                dpg.set_value(progress_label, "Index: Not Built")
+                dpg.set_value(next_shiny_label, "Next Shiny:")
+                return
+            dpg.set_value(progress_label, f"Index: {len(index.positions)} Shinies")
+            advance = index.next_shiny(self.initial_seed, self.current_advance)
+            if advance is None:
+                dpg.set_value(next_shiny_label, "Next Shiny: None")
+                return
+            dpg.set_value(
+                next_shiny_label,
+                f"Next Shiny: {advance} (in {advance - self.current_advance})"
+            )
+
+        return update
+
+    def memory_scanner_window(self):
+        """Scanner for locating unknown ram addresses"""
+
+        scanner = None
+        result_limit = 50
+
+        def show_results(count: int):
+            dpg.set_value(count_label, f"Candidates: {count}")
+            dpg.configure_item(
+                results_list,
+                items=[f"{address:08X}: {value:X}" for address, value in scanner.results(result_limit)]
+            )
+
+        def new_scan():
+            nonlocal scanner
+            scanner = MemoryScanner(self.hook, int(dpg.get_value(width_combo)))
+            scanner.reset()
+            show_results(len(scanner.candidates))
+
+        def scan_filter(apply_filter):
+            def callback():
+                if scanner is None:
+                    new_scan()
+                show_results(apply_filter())
+            return callback
+
+        def wild_pid():
+            pk3 = self.read_pk3(self.wild_addr)
+            return scanner.equals(pk3.pid if pk3 is not None else 0)
+
+        def save_override():
+            selected = dpg.get_value(results_list)
+            if selected:
+                self.save_address_override(
+                    dpg.get_value(override_combo),
+                    int(selected.split(":")[0], 16)
+                )
+
+        with dpg.window(label="Memory Scanner", width=240, no_close=True, pos=[241, 300], collapsed=True):
+            width_combo = dpg.add_combo(["4", "2", "1"], default_value="4", label="Bytes")
+            dpg.add_button(label="New Scan", callback=new_scan)
+            with dpg.group(horizontal=True):
+                dpg.add_button(label="Changed", callback=scan_filter(lambda: scanner.changed()))
+                dpg.add_button(label="Unchanged", callback=scan_filter(lambda: scanner.unchanged()))
+            max_advances_input = dpg.add_input_int(
+                label="Max Advances", default_value=10000, min_value=1, min_clamped=True
+            )
+            dpg.add_button(
+                label="LCRNG Advanced",
+                callback=scan_filter(
+                    lambda: scanner.lcrng_advanced(dpg.get_value(max_advances_input), self.rng)
+                )
+            )
+            value_input = dpg.add_input_text(label="Value", hexadecimal=True, default_value="0")
+            with dpg.group(horizontal=True):
+                dpg.add_button(
+                    label="Equals",
+                    callback=scan_filter(
+                        lambda: scanner.equals(int(dpg.get_value(value_input) or "0", 16))
+                    )
+                )
+                dpg.add_button(label="Equals Wild PID", callback=scan_filter(wild_pid))
+            count_label = dpg.add_text("Candidates:")
+            results_list = dpg.add_listbox([], num_items=6)
+            override_combo = dpg.add_combo(
+                list(self.OVERRIDABLE_ADDRESSES),
+                default_value="current_seed_addr",
+                label="Address",
+            )
+            dpg.add_button(label="Save Override", callback=save_override)
+
+        # results only change from button callbacks
+        return None
+
+    def advance_table_window(self):
+        """Browsable method 1 advances"""
+
+        def generate():
+            tsv = None if self.tid is None else self.tid ^ self.sid
+            table.set_data_source(
+                Method1DataSource(
+                    self.initial_seed,
+                    dpg.get_value(start_input),
+                    dpg.get_value(count_input),
+                    tsv
+                )
+            )
+
+        with dpg.window(label="Advances", width=560, no_close=True, pos=[241, 125], collapsed=True):
+            with dpg.group(horizontal=True):
+                start_input = dpg.add_input_int(
+                    label="Start", width=100, min_value=0, min_clamped=True
+                )
+                count_input = dpg.add_input_int(
+                    label="Count", width=100, default_value=10_000_000, min_value=1, min_clamped=True
+                )
+                dpg.add_button(label="Generate", callback=generate)
+            with dpg.group(horizontal=True):
+                jump_input = dpg.add_input_int(
+                    label="Advance", width=100, min_value=0, min_clamped=True
+                )
+                dpg.add_button(label="Jump", callback=lambda: table.jump_to(dpg.get_value(jump_input)))
+                follow_checkbox = dpg.add_checkbox(label="Follow Current")
+            table = VirtualTable(
+                [
+                    ("Advance", lambda row: str(row["advance"])),
+                    ("Seed", lambda row: f"{row['seed']:08X}"),
+                    ("PID", lambda row: f"{row['pid']:08X}"),
+                    ("Shiny", lambda row: "Yes" if row["shiny"] else ""),
+                    ("Nature", lambda row: NATURES[row["nature"]]),
+                    ("IVs", lambda row: "/".join(str(row[field]) for field in IV_FIELDS)),
+                ]
+            )
+
+        def update():
+            if dpg.get_value(follow_checkbox):
+                table.jump_to(self.current_advance)
+            table.highlight(self.current_advance)
+
+        return update
@@ -0,0 +1,146 @@
+"""Background jobs run on a process pool, drained from the render loop"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+import heapq
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+
+# cores left free for the render loop and the emulator
+RESERVED_CORES = 2
+# fresh interpreters for workers on every platform, forking the gui process would
+# copy its render, timer and session log threads' state
+MP_CONTEXT = multiprocessing.get_context("spawn")
+
+
+class Job:
+    """Sharded computation, shard results are collected in shard order"""
+
+    def __init__(
+        self,
+        shard_function: Callable,
+        shards: list[tuple],
+        priority: int,
+        on_progress: Callable[[int, int, Any], None] = None,
+        on_done: Callable[[list], None] = None,
+    ) -> None:
+        self.shard_function = shard_function
+        self.shards = shards
+        self.priority = priority
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.results = [None] * len(shards)
+        self.done = 0
+        self.cancelled = False
+
+    @property
+    def total(self) -> int:
+        """Number of shards"""
+        return len(self.shards)
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has completed or been cancelled"""
+        return self.cancelled or self.done == self.total
+
+
+class JobExecutor:
+    """Process pool fed one shard per free worker so priority and cancellation
+    apply to everything not yet running
+
+    Shard completions are queued from the pool's thread and only dispatched to
+    job callbacks by poll, so callbacks always run on the render thread
+    """
+
+    def __init__(self, workers: int = None) -> None:
+        self.workers = workers or max(1, (os.cpu_count() or 1) - RESERVED_CORES)
+        self.executor = None
+        # (priority, submission order, shard index, job)
+        self.pending = []
+        self.running = {}
+        self.completed = queue.SimpleQueue()
+        self.counter = itertools.count()
+
+    def submit(
+        self,
+        shard_function: Callable,
+        shards: list[tuple],
+        on_progress: Callable[[int, int, Any], None] = None,
+        on_done: Callable[[list], None] = None,
+        priority: int = 0,
+    ) -> Job:
+        """Queue a job, lower priority values run first"""
+        job = Job(shard_function, shards, priority, on_progress, on_done)
+        order = next(self.counter)
+        for i in range(len(shards)):
+            heapq.heappush(self.pending, (priority, order, i, job))
+        if not shards and on_done is not None:
+            on_done([])
+        self.dispatch()
+        return job
+
+    def cancel(self, job: Job) -> None:
+        """Drop a job's pending shards and ignore its running ones"""
+        job.cancelled = True
+        self.pending = [entry for entry in self.pending if entry[3] is not job]
+        heapq.heapify(self.pending)
+        for future, (running_job, _, _) in self.running.items():
+            if running_job is job:
+                future.cancel()
+
+    def dispatch(self) -> None:
+        """Start pending shards on free workers"""
+        while self.pending and len(self.running) < self.workers:
+            _, _, i, job = heapq.heappop(self.pending)
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=MP_CONTEXT
+                )
+            future = self.executor.submit(job.shard_function, *job.shards[i])
+            self.running[future] = (job, i, self.executor)
+            future.add_done_callback(self.completed.put)
+
+    def poll(self) -> None:
+        """Dispatch finished shards to their jobs without blocking"""
+        while True:
+            try:
+                future: Future = self.completed.get_nowait()
+            except queue.Empty:
+                break
+            entry = self.running.pop(future, None)
+            if entry is None or future.cancelled():
+                continue
+            job, i, executor = entry
+            if job.cancelled:
+                continue
+            error = future.exception()
+            if error is not None:
+                logging.error(f"Job shard failed: {error!r}")
+                self.cancel(job)
+                if isinstance(error, BrokenProcessPool) and executor is self.executor:
+                    # a dead worker takes the whole pool down, start a new one
+                    self.executor.shutdown(wait=False, cancel_futures=True)
+                    self.executor = None
+                continue
+            job.results[i] = future.result()
+            job.done += 1
+            if job.on_progress is not None:
+                job.on_progress(job.done, job.total, job.results[i])
+            if job.done == job.total and job.on_done is not None:
+                job.on_done(job.results)
+        self.dispatch()
+
+    def shutdown(self) -> None:
+        """Cancel everything and stop the pool"""
+        self.pending.clear()
+        for job, _, _ in self.running.values():
+            job.cancelled = True
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.running.clear()
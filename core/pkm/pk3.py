@@ -71,6 +71,23 @@ class PK3:
                 self.buf[0x20 + (12 * ofs):0x20 + (12 * (ofs + 1))]
         self.buf = data_copy
 
+    def calculate_checksum(self) -> int:
+        """Calculate checksum of the decrypted data blocks"""
+        checksum = 0
+        for i in range(0x20, 0x50, 2):
+            checksum += self.read_uint(i, 2)
+        return checksum & 0xFFFF
+
+    @property
+    def checksum(self) -> int:
+        """Stored checksum"""
+        return self.read_uint(0x1C, 2)
+
+    @property
+    def is_valid(self) -> bool:
+        """Stored checksum matches the data blocks"""
+        return self.checksum == self.calculate_checksum()
+
     @property
     def pid(self) -> int:
         """Personality value"""
@@ -0,0 +1,92 @@
+"""Linear congruential generators"""
+
+# jump tables cached per (mult, add)
+JUMP_TABLES: dict[tuple[int, int], tuple[tuple[int, int], ...]] = {}
+
+
+class LCG:
+    """32-bit linear congruential generator"""
+
+    def __init__(self, mult: int, add: int) -> None:
+        self.mult = mult
+        self.add = add
+        self.jump_table = self.get_jump_table(mult, add)
+        self._reverse = None
+
+    @staticmethod
+    def get_jump_table(mult: int, add: int) -> tuple[tuple[int, int], ...]:
+        """(mult, add) pairs jumping 2**i advances, built once per generator"""
+        key = (mult, add)
+        if key not in JUMP_TABLES:
+            table = []
+            for _ in range(32):
+                table.append((mult, add))
+                add = (add * (mult + 1)) & 0xFFFFFFFF
+                mult = (mult * mult) & 0xFFFFFFFF
+            JUMP_TABLES[key] = tuple(table)
+        return JUMP_TABLES[key]
+
+    @property
+    def reverse(self) -> "LCG":
+        """Generator stepping backwards through this generator's states"""
+        if self._reverse is None:
+            mult = pow(self.mult, -1, 0x100000000)
+            self._reverse = LCG(mult, (-self.add * mult) & 0xFFFFFFFF)
+        return self._reverse
+
+    def next(self, seed: int) -> int:
+        """Advance seed once"""
+        return (seed * self.mult + self.add) & 0xFFFFFFFF
+
+    def advance(self, seed: int, advances: int) -> int:
+        """Advance seed by advances in O(log n)"""
+        advances &= 0xFFFFFFFF
+        for mult, add in self.jump_table:
+            if not advances:
+                break
+            if advances & 1:
+                seed = (seed * mult + add) & 0xFFFFFFFF
+            advances >>= 1
+        return seed
+
+    def jump_back(self, seed: int, advances: int) -> int:
+        """Step seed back by advances in O(log n)"""
+        return self.reverse.advance(seed, advances)
+
+    def distance(self, state0: int, state1: int) -> int:
+        """Efficiently compute the distance from state0 -> state1"""
+        mask = 1
+        dist = 0
+
+        for mult, add in self.jump_table:
+            if state0 == state1:
+                break
+
+            if (state0 ^ state1) & mask:
+                state0 = (state0 * mult + add) & 0xFFFFFFFF
+                dist += mask
+
+            mask <<= 1
+
+        return dist
+
+    def batch(self, seed: int, count: int) -> list[int]:
+        """The next count states after seed"""
+        mult, add = self.mult, self.add
+        states = []
+        for _ in range(count):
+            seed = (seed * mult + add) & 0xFFFFFFFF
+            states.append(seed)
+        return states
+
+    def batch_distance(self, state0: int, states: list[int]) -> list[int]:
+        """Distance from state0 to each of states"""
+        return [self.distance(state0, state1) for state1 in states]
+
+
+# Gen 3 LCRNG
+LCRNG = LCG(0x41C64E6D, 0x6073)
+LCRNG_R = LCRNG.reverse
+# Colosseum/XD LCG
+XDRNG = LCG(0x343FD, 0x269EC3)
+XDRNG_R = XDRNG.reverse
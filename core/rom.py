@@ -0,0 +1,176 @@
+"""Gen 3 ROM data"""
+
+from array import array
+from enum import IntEnum
+import hashlib
+import mmap
+import struct
+
+from .util import SPECIES_MAP
+
+ROM_BASE = 0x8000000
+
+# map group, map num, land/water/rock smash/fishing info pointers
+WILD_HEADER = struct.Struct("<BBxxIIII")
+# encounter rate, mons pointer
+WILD_INFO = struct.Struct("<BxxxI")
+# min level, max level, species
+WILD_MON = struct.Struct("<BBH")
+WILD_HEADER_TERMINATOR = 0xFFFF
+# MAP_UNDEFINED header with null tables that ends the header table
+WILD_HEADER_TERMINATOR_BYTES = b"\xFF\xFF" + bytes(18)
+# headers that must precede a terminator for it to be accepted
+MIN_WILD_HEADERS = 20
+
+
+class EncounterType(IntEnum):
+    """Wild encounter table type"""
+    LAND = 0
+    WATER = 1
+    ROCK_SMASH = 2
+    FISHING = 3
+
+
+class FishingRod(IntEnum):
+    """Fishing rod"""
+    OLD = 0
+    GOOD = 1
+    SUPER = 2
+
+
+SLOT_COUNTS = (12, 5, 5, 10)
+
+# cumulative slot thresholds out of 100
+LAND_THRESHOLDS = (20, 40, 50, 60, 70, 80, 85, 90, 94, 98, 99, 100)
+WATER_THRESHOLDS = (60, 90, 95, 99, 100)
+# (first slot, cumulative thresholds) per rod
+ROD_THRESHOLDS = (
+    (0, (70, 100)),
+    (2, (60, 80, 100)),
+    (5, (40, 80, 95, 99, 100)),
+)
+
+
+def slot_from_rand(encounter_type: EncounterType, rand: int, rod: FishingRod = None) -> int:
+    """Encounter slot chosen by a 16-bit rand"""
+    rand %= 100
+    first_slot = 0
+    if encounter_type == EncounterType.LAND:
+        thresholds = LAND_THRESHOLDS
+    elif encounter_type == EncounterType.FISHING:
+        first_slot, thresholds = ROD_THRESHOLDS[rod]
+    else:
+        thresholds = WATER_THRESHOLDS
+    for slot, threshold in enumerate(thresholds):
+        if rand < threshold:
+            return first_slot + slot
+    return first_slot + len(thresholds) - 1
+
+
+class EncounterTable:
+    """Wild encounter slots stored as compact arrays"""
+
+    def __init__(self, rate: int, buf: bytes) -> None:
+        self.rate = rate
+        self.min_levels = array("B", buf[0::4])
+        self.max_levels = array("B", buf[1::4])
+        self.species = array(
+            "H",
+            (SPECIES_MAP[species] if species < len(SPECIES_MAP) else 0
+             for (_, _, species) in WILD_MON.iter_unpack(buf))
+        )
+
+
+class RomData:
+    """Memory-mapped gen 3 ROM with a lazily built wild encounter index"""
+
+    def __init__(self, rom_file_path: str) -> None:
+        self.rom_file = open(rom_file_path, "rb")
+        self.rom = mmap.mmap(self.rom_file.fileno(), 0, access=mmap.ACCESS_READ)
+        # (map group << 8 | map num) -> header offset
+        self.wild_header_offsets: dict[int, int] | None = None
+        self.encounter_tables: dict[tuple[int, EncounterType], EncounterTable | None] = {}
+        self._sha1 = None
+
+    @property
+    def sha1(self) -> str:
+        """Hex SHA-1 of the whole ROM, distinguishes hacks that keep the vanilla game code"""
+        if self._sha1 is None:
+            self._sha1 = hashlib.sha1(self.rom).hexdigest()
+        return self._sha1
+
+    def close(self) -> None:
+        """Unmap the ROM"""
+        self.rom.close()
+        self.rom_file.close()
+
+    def is_rom_pointer(self, pointer: int) -> bool:
+        """Pointer is aligned and inside the ROM"""
+        return pointer & 3 == 0 and ROM_BASE <= pointer < ROM_BASE + len(self.rom)
+
+    def is_wild_header(self, offset: int) -> bool:
+        """Offset holds a plausible wild header"""
+        map_group, _, *pointers = WILD_HEADER.unpack_from(self.rom, offset)
+        return (
+            map_group < 0x40
+            and any(pointers)
+            and all(pointer == 0 or self.is_rom_pointer(pointer) for pointer in pointers)
+        )
+
+    def find_wild_headers(self) -> int | None:
+        """Offset of the wild encounter header table
+
+        Found by locating the table's terminator and walking back over valid headers
+        """
+        pos = 0
+        while (terminator := self.rom.find(WILD_HEADER_TERMINATOR_BYTES, pos)) != -1:
+            pos = terminator + 1
+            if terminator & 3:
+                continue
+            offset = terminator
+            while offset >= WILD_HEADER.size and self.is_wild_header(offset - WILD_HEADER.size):
+                offset -= WILD_HEADER.size
+            if (terminator - offset) // WILD_HEADER.size >= MIN_WILD_HEADERS:
+                return offset
+        return None
+
+    def index_wild_headers(self) -> dict[int, int]:
+        """Build the map -> wild header index"""
+        self.wild_header_offsets = {}
+        offset = self.find_wild_headers()
+        if offset is None:
+            return self.wild_header_offsets
+        while offset + WILD_HEADER.size <= len(self.rom):
+            map_group, map_num, *_ = WILD_HEADER.unpack_from(self.rom, offset)
+            if (map_group << 8 | map_num) == WILD_HEADER_TERMINATOR:
+                break
+            self.wild_header_offsets.setdefault(map_group << 8 | map_num, offset)
+            offset += WILD_HEADER.size
+        return self.wild_header_offsets
+
+    def encounter_table(
+        self,
+        map_group: int,
+        map_num: int,
+        encounter_type: EncounterType
+    ) -> EncounterTable | None:
+        """Encounter table of a map, parsed on first access"""
+        key = (map_group << 8 | map_num, encounter_type)
+        if key in self.encounter_tables:
+            return self.encounter_tables[key]
+        if self.wild_header_offsets is None:
+            self.index_wild_headers()
+        table = None
+        header_offset = self.wild_header_offsets.get(key[0])
+        if header_offset is not None:
+            info_pointer = WILD_HEADER.unpack_from(self.rom, header_offset)[2 + encounter_type]
+            if self.is_rom_pointer(info_pointer):
+                rate, mons_pointer = WILD_INFO.unpack_from(self.rom, info_pointer - ROM_BASE)
+                if self.is_rom_pointer(mons_pointer):
+                    start = mons_pointer - ROM_BASE
+                    table = EncounterTable(
+                        rate,
+                        self.rom[start:start + SLOT_COUNTS[encounter_type] * WILD_MON.size]
+                    )
+        self.encounter_tables[key] = table
+        return table
@@ -0,0 +1,59 @@
+"""Frame-aligned memory sampling"""
+
+from typing import Callable
+import time
+
+
+class FrameSampler:
+    """Decide when to do the full read set by watching the emulator's frame counter
+
+    Reads are triggered once per new frame; when the counter stops moving
+    emulation is treated as paused and polling backs off
+    """
+
+    # seconds without a new frame before emulation is considered paused
+    PAUSE_TIMEOUT = 0.25
+    MIN_BACKOFF = 1 / 60
+    MAX_BACKOFF = 0.2
+
+    def __init__(self, read_frame: Callable[[], int] | None) -> None:
+        self.read_frame = read_frame
+        self.enabled = True
+        self.last_frame = None
+        self.last_change = time.perf_counter()
+        self.next_poll = 0.0
+        self.backoff = 0.0
+        self.paused = False
+        # frames that passed without being sampled
+        self.skipped_frames = 0
+        self.last_skip = 0
+
+    def poll(self) -> bool:
+        """Whether a new frame has started since the last full read"""
+        if self.read_frame is None or not self.enabled:
+            return True
+        now = time.perf_counter()
+        if now < self.next_poll:
+            return False
+        frame = self.read_frame()
+        if frame == self.last_frame:
+            if now - self.last_change > self.PAUSE_TIMEOUT:
+                self.backoff = min(max(self.backoff * 2, self.MIN_BACKOFF), self.MAX_BACKOFF)
+                self.next_poll = now + self.backoff
+                if not self.paused:
+                    # one more full read so the pause can be displayed
+                    self.paused = True
+                    return True
+            return False
+        if self.last_frame is not None and frame > self.last_frame:
+            self.last_skip = frame - self.last_frame - 1
+            self.skipped_frames += self.last_skip
+        else:
+            # first sample, or the counter restarted on a soft reset
+            self.last_skip = 0
+        self.last_frame = frame
+        self.last_change = now
+        self.paused = False
+        self.backoff = 0.0
+        self.next_poll = 0.0
+        return True
@@ -0,0 +1,152 @@
+"""Gen 3 save file"""
+
+import mmap
+import struct
+
+from .pkm.pk3 import PK3
+
+SECTOR_SIZE = 0x1000
+SECTOR_DATA_SIZE = 0xF80
+SECTORS_PER_SLOT = 14
+# section id, checksum, signature, save index
+SECTOR_FOOTER = struct.Struct("<HHII")
+SECTOR_FOOTER_OFFSET = 0xFF4
+SECTOR_SIGNATURE = 0x08012025
+
+# bytes of each section covered by its checksum
+SECTION_SIZES = (0xF2C, 0xF80, 0xF80, 0xF80, 0xF08) + (SECTOR_DATA_SIZE,) * 8 + (0x7D0,)
+
+PC_SECTIONS = range(5, 14)
+# the last pc section is only partially used
+PC_SECTION_SIZES = (SECTOR_DATA_SIZE,) * 8 + (0x7D0,)
+BOX_COUNT = 14
+BOX_SLOTS = 30
+BOX_MON_SIZE = 0x50
+PARTY_MON_SIZE = 0x64
+PARTY_SIZE = 6
+
+
+def sector_checksum(data: bytes) -> int:
+    """Folded sum of the 32-bit words of a section"""
+    total = sum(struct.unpack(f"<{len(data) // 4}I", data))
+    return ((total >> 16) + total) & 0xFFFF
+
+
+def newer_save_index(first: int, second: int) -> bool:
+    """Whether first was written after second, allowing for the counter wrapping"""
+    return first != second and (first - second) & 0xFFFFFFFF < 0x80000000
+
+
+class SAV3:
+    """Gen 3 save file"""
+
+    def __init__(self, buf: bytes) -> None:
+        self.buf = buf
+        # section id -> offset of the section data in buf
+        self.sections: dict[int, int] = {}
+        self.save_index = None
+        self.find_current_slot()
+
+    @classmethod
+    def open(cls, path: str) -> "SAV3":
+        """Memory-map a save file"""
+        with open(path, "rb") as sav_file:
+            return cls(mmap.mmap(sav_file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def close(self) -> None:
+        """Release a memory-mapped save"""
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+
+    def read_uint(self, section: int, offset: int, length: int) -> int:
+        """Read unsigned integer from offset of a section"""
+        start = self.sections[section] + offset
+        return int.from_bytes(self.buf[start:start + length], 'little')
+
+    def read_slot(self, slot: int) -> tuple[int | None, dict[int, int]]:
+        """Save index and section offsets of the valid sectors of a save slot
+
+        Sectors with a bad signature or checksum, or whose save index differs from
+        the slot's first valid sector, are left out
+        """
+        save_index = None
+        sections = {}
+        for sector in range(slot * SECTORS_PER_SLOT, (slot + 1) * SECTORS_PER_SLOT):
+            offset = sector * SECTOR_SIZE
+            if offset + SECTOR_SIZE > len(self.buf):
+                break
+            section, checksum, signature, index = SECTOR_FOOTER.unpack_from(
+                self.buf,
+                offset + SECTOR_FOOTER_OFFSET
+            )
+            if signature != SECTOR_SIGNATURE or section >= SECTORS_PER_SLOT:
+                continue
+            if sector_checksum(self.buf[offset:offset + SECTION_SIZES[section]]) != checksum:
+                continue
+            if save_index is None:
+                save_index = index
+            elif index != save_index:
+                continue
+            sections[section] = offset
+        return save_index, sections
+
+    def find_current_slot(self) -> None:
+        """Use the most recently written save slot that is fully valid"""
+        candidates = [
+            self.read_slot(slot) for slot in range(2)
+        ]
+        candidates = [
+            (index, sections) for index, sections in candidates
+            if len(sections) == SECTORS_PER_SLOT
+        ]
+        if not candidates:
+            raise ValueError("No valid save slot found")
+        self.save_index, self.sections = candidates[0]
+        for index, sections in candidates[1:]:
+            if newer_save_index(index, self.save_index):
+                self.save_index, self.sections = index, sections
+
+    @property
+    def is_frlg(self) -> bool:
+        """FRLG save (game code in section 0)"""
+        return self.read_uint(0, 0xAC, 4) == 1
+
+    @property
+    def tid(self) -> int:
+        """Trainer ID"""
+        return self.read_uint(0, 0xA, 2)
+
+    @property
+    def sid(self) -> int:
+        """Secret ID"""
+        return self.read_uint(0, 0xC, 2)
+
+    @property
+    def party(self) -> list[PK3]:
+        """Party pokemon"""
+        party_offset = 0x38 if self.is_frlg else 0x238
+        count = min(self.read_uint(1, party_offset - 4, 4), PARTY_SIZE)
+        start = self.sections[1] + party_offset
+        return [
+            PK3(self.buf[start + i * PARTY_MON_SIZE:start + i * PARTY_MON_SIZE + BOX_MON_SIZE])
+            for i in range(count)
+        ]
+
+    def pc_buffer(self) -> bytes:
+        """PC storage rebuilt from its sections"""
+        return b"".join(
+            self.buf[self.sections[section]:self.sections[section] + size]
+            for section, size in zip(PC_SECTIONS, PC_SECTION_SIZES)
+        )
+
+    @property
+    def boxes(self) -> list[PK3 | None]:
+        """All 420 box slots, None for empty slots"""
+        pc_buffer = self.pc_buffer()
+        # skip the current box index
+        start = 4
+        box_mons = []
+        for i in range(BOX_COUNT * BOX_SLOTS):
+            data = pc_buffer[start + i * BOX_MON_SIZE:start + (i + 1) * BOX_MON_SIZE]
+            box_mons.append(PK3(data) if any(data) else None)
+        return box_mons
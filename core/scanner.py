@@ -0,0 +1,102 @@
+"""RAM scanner for locating unknown addresses"""
+
+import numpy as np
+
+from .hook.hook import Hook
+from .rng import LCG, LCRNG
+
+# (start, size) of the scanned memory sections
+SCAN_REGIONS = (
+    (0x2000000, 0x40000),  # WRAM
+    (0x3000000, 0x8000),  # IRAM
+)
+DTYPES = {
+    1: np.dtype("u1"),
+    2: np.dtype("<u2"),
+    4: np.dtype("<u4"),
+}
+
+
+def lcg_distance_array(lcg: LCG, state0: np.ndarray, state1: np.ndarray) -> np.ndarray:
+    """Vectorized distance from each of state0 -> state1"""
+    state0 = state0.astype(np.uint32)
+    state1 = state1.astype(np.uint32)
+    dist = np.zeros(state0.shape, np.uint32)
+    for bit, (mult, add) in enumerate(lcg.jump_table):
+        mask = np.uint32(1 << bit)
+        step = ((state0 ^ state1) & mask) != 0
+        state0 = np.where(step, state0 * np.uint32(mult) + np.uint32(add), state0)
+        dist |= np.where(step, mask, np.uint32(0))
+    return dist
+
+
+class MemoryScanner:
+    """Narrow down candidate addresses over successive snapshots"""
+
+    def __init__(self, hook: Hook, width: int = 4) -> None:
+        self.hook = hook
+        self.width = width
+        self.dtype = DTYPES[width]
+        self.addresses = np.concatenate(
+            [np.arange(start, start + size, width, dtype=np.uint32) for start, size in SCAN_REGIONS]
+        )
+        self.previous: np.ndarray = None
+        self.current: np.ndarray = None
+        # indices into addresses still under consideration
+        self.candidates: np.ndarray = None
+
+    def snapshot(self) -> np.ndarray:
+        """Read every scanned value"""
+        return np.concatenate(
+            [
+                np.frombuffer(region, self.dtype)
+                for region in self.hook.read_many(SCAN_REGIONS)
+            ]
+        )
+
+    def reset(self) -> None:
+        """Start a new scan with every address as a candidate"""
+        self.previous = None
+        self.current = self.snapshot()
+        self.candidates = np.arange(len(self.addresses))
+
+    def step(self) -> tuple[np.ndarray, np.ndarray]:
+        """Take a new snapshot, returning (previous, current) candidate values"""
+        if self.candidates is None:
+            self.reset()
+        self.previous = self.current
+        self.current = self.snapshot()
+        return self.previous[self.candidates], self.current[self.candidates]
+
+    def narrow(self, keep: np.ndarray) -> int:
+        """Keep candidates where keep is true, returning the remaining count"""
+        self.candidates = self.candidates[keep]
+        return len(self.candidates)
+
+    def changed(self) -> int:
+        """Keep values that changed since the last snapshot"""
+        previous, current = self.step()
+        return self.narrow(previous != current)
+
+    def unchanged(self) -> int:
+        """Keep values that did not change since the last snapshot"""
+        previous, current = self.step()
+        return self.narrow(previous == current)
+
+    def equals(self, value: int) -> int:
+        """Keep values equal to value"""
+        _, current = self.step()
+        return self.narrow(current == value)
+
+    def lcrng_advanced(self, max_advances: int, lcg: LCG = LCRNG) -> int:
+        """Keep values that advanced by 1..max_advances steps of an LCG since the last snapshot"""
+        previous, current = self.step()
+        distance = lcg_distance_array(lcg, previous, current)
+        return self.narrow((distance > 0) & (distance <= max_advances))
+
+    def results(self, limit: int = None) -> list[tuple[int, int]]:
+        """(address, current value) of the remaining candidates"""
+        candidates = self.candidates[:limit]
+        return list(
+            zip(self.addresses[candidates].tolist(), self.current[candidates].tolist())
+        )
@@ -0,0 +1,146 @@
+"""Full-period index of shiny method 1/2/4 PIDs"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable
+import os
+
+import numba
+import numpy as np
+
+from ..jobs import MP_CONTEXT
+from ..rng import LCRNG
+
+SHINY_INDEX_DIR = "shiny_index"
+# positions walked by one shard
+SHARD_SIZE = 1 << 26
+PERIOD = 1 << 32
+
+
+@numba.njit(cache=True)
+def _scan(
+    state: int,
+    position: int,
+    count: int,
+    shiny_group: int,
+    mult: int,
+    add: int,
+    results: np.ndarray,
+) -> tuple[int, int]:
+    """Fill results with positions in [position, position + count) whose next two rands
+    form a shiny PID, returns the number found and the number of positions walked"""
+    found = 0
+    # separate uint32 locals, reassigning the int64 arguments would unify their types
+    mult32 = np.uint32(mult)
+    add32 = np.uint32(add)
+    group32 = np.uint32(shiny_group)
+    shift = np.uint32(19)
+    # uint32 arithmetic wraps, no masking needed
+    low = np.uint32(np.uint32(state) * mult32 + add32)
+    for i in range(count):
+        high = np.uint32(low * mult32 + add32)
+        # ((low >> 16) ^ (high >> 16)) >> 3
+        if ((low ^ high) >> shift) == group32:
+            if found == len(results):
+                # full, the caller resumes from here
+                return found, i
+            results[found] = position + i
+            found += 1
+        low = high
+    return found, count
+
+
+def scan_shard(shiny_group: int, start: int, count: int) -> np.ndarray:
+    """Shiny positions of one shard of the period"""
+    # roughly twice the expected 1 in 8192 density
+    results = np.empty(max(count >> 12, 64), np.uint32)
+    chunks = []
+    while count > 0:
+        found, walked = _scan(
+            LCRNG.advance(0, start),
+            start,
+            count,
+            shiny_group,
+            LCRNG.mult,
+            LCRNG.add,
+            results,
+        )
+        chunks.append(results[:found].copy())
+        start += walked
+        count -= walked
+    return np.concatenate(chunks)
+
+
+def index_shards(shiny_group: int) -> list[tuple[int, int, int]]:
+    """Arguments of every shard of the full period"""
+    return [(shiny_group, start, SHARD_SIZE) for start in range(0, PERIOD, SHARD_SIZE)]
+
+
+class ShinyIndex:
+    """Sorted positions, measured from seed 0, of every state that gives a shiny PID
+
+    The PID is formed from the next two rands (low half first), which is shared
+    by methods 1, 2 and 4. Shininess only depends on the TSV's upper 13 bits,
+    so one index covers every TID/SID with the same shiny group.
+    """
+
+    def __init__(self, positions: np.ndarray) -> None:
+        self.positions = positions
+
+    @staticmethod
+    def shiny_group(tid: int, sid: int) -> int:
+        """Upper 13 bits of the trainer shiny value"""
+        return (tid ^ sid) >> 3
+
+    @staticmethod
+    def cache_path(shiny_group: int) -> str:
+        """On-disk location of an index"""
+        return os.path.join(SHINY_INDEX_DIR, f"{shiny_group:04X}.npy")
+
+    @classmethod
+    def load(cls, tid: int, sid: int) -> "ShinyIndex | None":
+        """Cached index for a trainer"""
+        try:
+            return cls(np.load(cls.cache_path(cls.shiny_group(tid, sid)), mmap_mode="r"))
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def from_shards(cls, tid: int, sid: int, shard_results: list[np.ndarray]) -> "ShinyIndex":
+        """Combine shard results, in shard order, and cache them"""
+        positions = np.concatenate(shard_results)
+        os.makedirs(SHINY_INDEX_DIR, exist_ok=True)
+        np.save(cls.cache_path(cls.shiny_group(tid, sid)), positions)
+        return cls(positions)
+
+    @classmethod
+    def build(
+        cls,
+        tid: int,
+        sid: int,
+        progress: Callable[[int, int], None] = None,
+        workers: int = None,
+    ) -> "ShinyIndex":
+        """Scan the full period on a process pool and cache the index"""
+        shards = index_shards(cls.shiny_group(tid, sid))
+        results = [None] * len(shards)
+        with ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            mp_context=MP_CONTEXT
+        ) as executor:
+            futures = {executor.submit(scan_shard, *shard): i for i, shard in enumerate(shards)}
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if progress is not None:
+                    progress(done, len(shards))
+        return cls.from_shards(tid, sid, results)
+
+    def next_shiny(self, initial_seed: int, advance: int) -> int | None:
+        """First shiny advance at or after advance from initial_seed"""
+        if len(self.positions) == 0:
+            return None
+        position = (LCRNG.distance(0, initial_seed) + advance) % PERIOD
+        index = int(np.searchsorted(self.positions, np.uint32(position)))
+        # wrap around the period
+        if index == len(self.positions):
+            index = 0
+        return advance + (int(self.positions[index]) - position) % PERIOD
@@ -0,0 +1,113 @@
+"""Initial seed search from TID/SID"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable
+import os
+
+from ..jobs import MP_CONTEXT
+from ..rng import LCRNG, LCRNG_R
+
+# advances or seeds handled by one shard
+SHARD_SIZE = 0x100000
+
+
+def id_seeds(tid: int, sid: int) -> list[int]:
+    """Seeds whose next two rands are SID then TID
+
+    IDs are generated as (Random() << 16) | Random(), so the upper 16 bits of the
+    first state are the SID and of the second the TID
+    """
+    seeds = []
+    for low in range(0x10000):
+        state = (sid << 16) | low
+        if LCRNG.next(state) >> 16 == tid:
+            seeds.append(LCRNG_R.next(state))
+    return seeds
+
+
+def search_advance_shard(
+    id_seed_list: list[int],
+    seed_min: int,
+    seed_max: int,
+    advance_start: int,
+    advance_end: int,
+) -> list[tuple[int, int]]:
+    """(initial seed, advance) pairs found by stepping back over an advance range"""
+    results = []
+    mult, add = LCRNG_R.mult, LCRNG_R.add
+    for id_seed in id_seed_list:
+        seed = LCRNG_R.advance(id_seed, advance_start)
+        for advance in range(advance_start, advance_end):
+            if seed_min <= seed <= seed_max:
+                results.append((seed, advance))
+            seed = (seed * mult + add) & 0xFFFFFFFF
+    return results
+
+
+def search_seed_shard(
+    id_seed_list: list[int],
+    seed_start: int,
+    seed_end: int,
+    advance_min: int,
+    advance_max: int,
+) -> list[tuple[int, int]]:
+    """(initial seed, advance) pairs found by measuring the distance from each seed"""
+    results = []
+    for seed in range(seed_start, seed_end):
+        for id_seed in id_seed_list:
+            advance = LCRNG.distance(seed, id_seed)
+            if advance_min <= advance <= advance_max:
+                results.append((seed, advance))
+    return results
+
+
+def search_shards(
+    tid: int,
+    sid: int,
+    seed_range: tuple[int, int],
+    advance_range: tuple[int, int],
+) -> tuple[Callable, list[tuple]]:
+    """Shard function and per-shard arguments for a search
+
+    Walks whichever of the (inclusive) seed or advance range is smaller
+    """
+    id_seed_list = id_seeds(tid, sid)
+    seed_min, seed_max = seed_range
+    advance_min, advance_max = advance_range
+    if seed_max - seed_min < advance_max - advance_min:
+        return search_seed_shard, [
+            (id_seed_list, start, min(start + SHARD_SIZE, seed_max + 1), advance_min, advance_max)
+            for start in range(seed_min, seed_max + 1, SHARD_SIZE)
+        ]
+    return search_advance_shard, [
+        (id_seed_list, seed_min, seed_max, start, min(start + SHARD_SIZE, advance_max + 1))
+        for start in range(advance_min, advance_max + 1, SHARD_SIZE)
+    ]
+
+
+def search_tid_sid(
+    tid: int,
+    sid: int,
+    seed_range: tuple[int, int] = (0, 0xFFFF),
+    advance_range: tuple[int, int] = (0, 100000),
+    progress: Callable[[int, int, list[tuple[int, int]]], None] = None,
+    workers: int = None,
+) -> list[tuple[int, int]]:
+    """Every (initial seed, advance) in range that generates tid/sid
+
+    Shards run on a process pool, progress is called with
+    (shards done, total shards, new results) as each shard finishes
+    """
+    shard_function, shards = search_shards(tid, sid, seed_range, advance_range)
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        mp_context=MP_CONTEXT
+    ) as executor:
+        futures = [executor.submit(shard_function, *shard) for shard in shards]
+        for done, future in enumerate(as_completed(futures), 1):
+            shard_results = future.result()
+            results.extend(shard_results)
+            if progress is not None:
+                progress(done, len(shards), shard_results)
+    return sorted(results)
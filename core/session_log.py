@@ -0,0 +1,237 @@
+"""Hunt session analytics store"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+# bumped when a table changes shape, see migrate
+SCHEMA_VERSION = 1
+
+# encounters.pid_advance is the advance of the seed the PID was generated from,
+# NULL when it was not found near the live seed. Targets are the advance a
+# generation starts on, and Method H rolls the slot, level and nature (plus
+# rerolled PIDs until the nature matches) before the PID, so pid_advance - target
+# is offset by at least 3 and is compared between hits, not against 0
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    game TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reseeds (
+    session INTEGER NOT NULL REFERENCES sessions(id),
+    time REAL NOT NULL,
+    initial_seed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS encounters (
+    session INTEGER NOT NULL REFERENCES sessions(id),
+    time REAL NOT NULL,
+    pid INTEGER NOT NULL,
+    iv32 INTEGER NOT NULL,
+    species INTEGER NOT NULL,
+    shiny INTEGER NOT NULL,
+    initial_seed INTEGER NOT NULL,
+    pid_seed INTEGER,
+    pid_advance INTEGER,
+    target INTEGER
+);
+CREATE TABLE IF NOT EXISTS party_changes (
+    session INTEGER NOT NULL REFERENCES sessions(id),
+    time REAL NOT NULL,
+    slot INTEGER NOT NULL,
+    pid INTEGER NOT NULL,
+    species INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reseeds_session ON reseeds (session);
+CREATE INDEX IF NOT EXISTS encounters_session ON encounters (session);
+CREATE INDEX IF NOT EXISTS encounters_offset ON encounters (pid_advance - target)
+    WHERE target IS NOT NULL AND pid_advance IS NOT NULL;
+CREATE INDEX IF NOT EXISTS party_changes_session ON party_changes (session, slot);
+"""
+
+INSERTS = {
+    "reseeds": "INSERT INTO reseeds VALUES (?, ?, ?)",
+    "encounters": "INSERT INTO encounters VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "party_changes": "INSERT INTO party_changes VALUES (?, ?, ?, ?, ?)",
+}
+
+
+def migrate(connection: sqlite3.Connection) -> None:
+    """Bring a database written by an older version up to SCHEMA_VERSION"""
+    (version,) = connection.execute("PRAGMA user_version").fetchone()
+    if version >= SCHEMA_VERSION:
+        return
+    has_encounters = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'encounters'"
+    ).fetchone()
+    if version < 1 and has_encounters:
+        # seed/advance became the nullable pid_seed/pid_advance, the indexes follow the
+        # renamed table so they are dropped to be recreated on the new one
+        connection.executescript(
+            """
+            BEGIN;
+            DROP INDEX IF EXISTS encounters_session;
+            DROP INDEX IF EXISTS encounters_offset;
+            ALTER TABLE encounters RENAME TO encounters_v0;
+            """
+            + SCHEMA
+            + """
+            INSERT INTO encounters SELECT * FROM encounters_v0;
+            DROP TABLE encounters_v0;
+            COMMIT;
+            """
+        )
+    connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open a session database, creating or migrating the schema if needed"""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    migrate(connection)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class SessionLogger:
+    """Log hunt events to SQLite from a background thread
+
+    Events are queued by the render loop and inserted in one transaction per
+    flush interval so that logging never blocks on disk
+    """
+
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, path: str, game: str) -> None:
+        self.path = path
+        self.game = game
+        self.queue = queue.SimpleQueue()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def log_reseed(self, initial_seed: int) -> None:
+        """Record a new initial seed"""
+        self.queue.put(("reseeds", (time.time(), initial_seed)))
+
+    def log_encounter(
+        self,
+        pid: int,
+        iv32: int,
+        species: int,
+        shiny: bool,
+        initial_seed: int,
+        pid_seed: int | None,
+        pid_advance: int | None,
+        target: int | None,
+    ) -> None:
+        """Record a new wild encounter, pid_seed/pid_advance are None when unknown"""
+        self.queue.put(
+            (
+                "encounters",
+                (
+                    time.time(), pid, iv32, species, shiny, initial_seed,
+                    pid_seed, pid_advance, target,
+                )
+            )
+        )
+
+    def log_party_change(self, slot: int, pid: int, species: int) -> None:
+        """Record a change of the pokemon in a party slot"""
+        self.queue.put(("party_changes", (time.time(), slot, pid, species)))
+
+    def run(self) -> None:
+        """Writer loop"""
+        connection = connect(self.path)
+        with connection:
+            session = connection.execute(
+                "INSERT INTO sessions (started, game) VALUES (?, ?)",
+                (time.time(), self.game)
+            ).lastrowid
+        try:
+            while not self.stopped.wait(self.FLUSH_INTERVAL):
+                self.flush(connection, session)
+            self.flush(connection, session)
+        except sqlite3.Error as error:
+            logging.error(error)
+        finally:
+            connection.close()
+
+    def flush(self, connection: sqlite3.Connection, session: int) -> None:
+        """Insert every queued event in a single transaction"""
+        rows = {table: [] for table in INSERTS}
+        while True:
+            try:
+                table, values = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            rows[table].append((session, *values))
+        if not any(rows.values()):
+            return
+        with connection:
+            for table, table_rows in rows.items():
+                if table_rows:
+                    connection.executemany(INSERTS[table], table_rows)
+
+    def close(self) -> None:
+        """Flush remaining events and stop the writer"""
+        self.stopped.set()
+        self.thread.join()
+
+
+def hit_distribution(
+    connection: sqlite3.Connection,
+    session: int = None
+) -> list[tuple[int, int]]:
+    """(pid advance - target advance, count) for encounters with a target and known pid advance"""
+    query = (
+        "SELECT pid_advance - target AS offset, COUNT(*) FROM encounters"
+        " WHERE target IS NOT NULL AND pid_advance IS NOT NULL"
+    )
+    params = ()
+    if session is not None:
+        query += " AND session = ?"
+        params = (session,)
+    query += " GROUP BY offset ORDER BY offset"
+    return connection.execute(query, params).fetchall()
+
+
+def session_summary(connection: sqlite3.Connection) -> list[tuple]:
+    """(session, game, reseeds, encounters, shinies, exact hits, mean |offset|) per session
+
+    Hits and offsets compare the pid advance against the target, see SCHEMA
+    """
+    return connection.execute(
+        """
+        SELECT
+            sessions.id,
+            sessions.game,
+            (SELECT COUNT(*) FROM reseeds WHERE reseeds.session = sessions.id),
+            COUNT(encounters.pid),
+            COALESCE(SUM(encounters.shiny), 0),
+            COALESCE(SUM(encounters.pid_advance = encounters.target), 0),
+            AVG(ABS(encounters.pid_advance - encounters.target))
+        FROM sessions
+        LEFT JOIN encounters ON encounters.session = sessions.id
+        GROUP BY sessions.id
+        ORDER BY sessions.id
+        """
+    ).fetchall()
+
+
+def drift_over_time(
+    connection: sqlite3.Connection,
+    session: int
+) -> list[tuple[float, int]]:
+    """(time, pid advance - target advance) for a session in order"""
+    return connection.execute(
+        """
+        SELECT time, pid_advance - target FROM encounters
+        WHERE session = ? AND target IS NOT NULL AND pid_advance IS NOT NULL
+        ORDER BY time
+        """,
+        (session,)
+    ).fetchall()
@@ -0,0 +1,213 @@
+"""Frame-accurate target advance timer"""
+
+from typing import Callable
+import contextlib
+import logging
+import math
+import platform
+import shutil
+import struct
+import subprocess
+import threading
+import time
+
+import mem_edit
+
+from .exceptions import AddressOutOfRange, EmulatorNotResponding
+
+if platform.system() == "Windows":
+    import winsound
+else:
+    winsound = None
+
+# GBA refresh rate (cpu clock / cycles per frame)
+GBA_FPS = 16777216 / 280896
+BEEP_FREQUENCY = 880
+BEEP_DURATION = 0.05
+BEEP_SAMPLE_RATE = 22050
+# players reading raw 16-bit mono pcm from stdin, tried in order when winsound is
+# unavailable, with small output buffers to keep cue latency low
+AUDIO_PLAYERS = (
+    (
+        "paplay", "--raw", "--format=s16le", f"--rate={BEEP_SAMPLE_RATE}", "--channels=1",
+        "--latency-msec=10",
+    ),
+    (
+        "aplay", "-q", "-t", "raw", "-f", "S16_LE", f"-r{BEEP_SAMPLE_RATE}", "-c1",
+        "--buffer-time=20000",
+    ),
+    (
+        "play", "-q", "-t", "raw", "-e", "signed", "-b", "16", "-r", str(BEEP_SAMPLE_RATE),
+        "-c", "1", "-",
+    ),
+)
+
+
+def beep_pcm() -> bytes:
+    """Short sine beep as raw 16-bit mono pcm"""
+    step = 2 * math.pi * BEEP_FREQUENCY / BEEP_SAMPLE_RATE
+    sample_count = int(BEEP_SAMPLE_RATE * BEEP_DURATION)
+    return b"".join(
+        struct.pack("<h", int(0x3FFF * math.sin(step * i))) for i in range(sample_count)
+    )
+
+
+class BeepPlayer:
+    """Beeps through one long-lived command line audio player
+
+    The player is started ahead of the cues and each cue only writes the
+    pre-rendered pcm to its stdin, so no process startup lands on a cue
+    """
+
+    def __init__(self) -> None:
+        self.command = next(
+            (command for command in AUDIO_PLAYERS if shutil.which(command[0]) is not None),
+            None
+        )
+        self.pcm = beep_pcm()
+        self.process = None
+        if self.command is None:
+            logging.warning("No audio player found, timer cues will only be shown in the window")
+
+    def start(self) -> None:
+        """Start the player process if it is not already running"""
+        if self.command is None or (self.process is not None and self.process.poll() is None):
+            return
+        try:
+            self.process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                bufsize=0,
+            )
+        except OSError as error:
+            logging.error(f"Could not start audio player: {error}")
+            self.command = None
+
+    def play(self) -> None:
+        """Queue the beep on the running player"""
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.write(self.pcm)
+        except OSError as error:
+            logging.error(f"Could not play timer cue: {error}")
+            self.close()
+
+    def close(self) -> None:
+        """Stop the player process"""
+        if self.process is None:
+            return
+        with contextlib.suppress(OSError):
+            self.process.stdin.close()
+        self.process.terminate()
+        self.process = None
+
+
+class AdvanceTimer:
+    """Count down to the frame on which a target advance is reached
+
+    Runs on its own thread so that cue timing is not tied to the render loop
+    """
+
+    # seconds between polls of the frame counter
+    POLL_INTERVAL = 0.001
+    # weight of the newest sample in the advances/frame estimate
+    RATE_SMOOTHING = 0.1
+
+    def __init__(
+        self,
+        read_advance: Callable[[], int],
+        read_frame: Callable[[], int] | None = None,
+        cue_frames: tuple[int, ...] = (120, 90, 60, 30, 0),
+    ) -> None:
+        self.read_advance = read_advance
+        self.read_frame = read_frame or self.wall_clock_frame
+        self.cue_frames = cue_frames
+        self.target_advance = 0
+        self.current_advance = 0
+        self.advance_rate = 1.0
+        self.frames_remaining = None
+        self.last_cue = None
+        self.running = False
+        self.thread = None
+        self.beep_player = BeepPlayer() if winsound is None else None
+
+    @staticmethod
+    def wall_clock_frame() -> int:
+        """Frame count estimated from the system clock"""
+        return int(time.perf_counter() * GBA_FPS)
+
+    def start(self, target_advance: int) -> None:
+        """Start counting down to target_advance"""
+        self.stop()
+        self.target_advance = target_advance
+        self.frames_remaining = None
+        self.last_cue = None
+        self.running = True
+        if self.beep_player is not None:
+            self.beep_player.start()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the countdown"""
+        self.running = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+        if self.beep_player is not None:
+            self.beep_player.close()
+
+    def run(self) -> None:
+        """Timer loop"""
+        try:
+            last_frame = self.read_frame()
+            last_advance = self.current_advance = self.read_advance()
+            pending_cues = sorted(self.cue_frames, reverse=True)
+            first_sample = True
+            while self.running:
+                frame = self.read_frame()
+                if frame == last_frame:
+                    time.sleep(self.POLL_INTERVAL)
+                    continue
+                # correct drift from the live seed every frame
+                advance = self.current_advance = self.read_advance()
+                frame_delta = (frame - last_frame) & 0xFFFFFFFF
+                rate = (advance - last_advance) / frame_delta
+                if first_sample:
+                    self.advance_rate = rate
+                    first_sample = False
+                else:
+                    self.advance_rate += self.RATE_SMOOTHING * (rate - self.advance_rate)
+                last_frame, last_advance = frame, advance
+
+                if self.advance_rate <= 0:
+                    continue
+                self.frames_remaining = round(
+                    (self.target_advance - advance) / self.advance_rate
+                )
+                while pending_cues and self.frames_remaining <= pending_cues[0]:
+                    self.cue(pending_cues.pop(0))
+                if self.frames_remaining < 0:
+                    self.running = False
+        except (
+            AddressOutOfRange,
+            EmulatorNotResponding,
+            mem_edit.utils.MemEditError,
+            OSError,
+        ) as error:
+            logging.error(error)
+        except Exception:
+            logging.exception("Timer stopped unexpectedly")
+        finally:
+            self.running = False
+
+    def cue(self, frames: int) -> None:
+        """Audio/visual cue for the given number of remaining frames"""
+        self.last_cue = (frames, time.perf_counter())
+        if winsound is not None:
+            winsound.MessageBeep()
+        else:
+            self.beep_player.play()
@@ -7,58 +7,13 @@ import requests
 from dearpygui import dearpygui as dpg
 import mem_edit
 
-JUMP_DATA = (
-    # (mult, add)
-    (0x41C64E6D, 0x6073),
-    (0xC2A29A69, 0xE97E7B6A),
-    (0xEE067F11, 0x31B0DDE4),
-    (0xCFDDDF21, 0x67DBB608),
-    (0x5F748241, 0xCBA72510),
-    (0x8B2E1481, 0x1D29AE20),
-    (0x76006901, 0xBA84EC40),
-    (0x1711D201, 0x79F01880),
-    (0xBE67A401, 0x8793100),
-    (0xDDDF4801, 0x6B566200),
-    (0x3FFE9001, 0x803CC400),
-    (0x90FD2001, 0xA6B98800),
-    (0x65FA4001, 0xE6731000),
-    (0xDBF48001, 0x30E62000),
-    (0xF7E90001, 0xF1CC4000),
-    (0xEFD20001, 0x23988000),
-    (0xDFA40001, 0x47310000),
-    (0xBF480001, 0x8E620000),
-    (0x7E900001, 0x1CC40000),
-    (0xFD200001, 0x39880000),
-    (0xFA400001, 0x73100000),
-    (0xF4800001, 0xE6200000),
-    (0xE9000001, 0xCC400000),
-    (0xD2000001, 0x98800000),
-    (0xA4000001, 0x31000000),
-    (0x48000001, 0x62000000),
-    (0x90000001, 0xC4000000),
-    (0x20000001, 0x88000000),
-    (0x40000001, 0x10000000),
-    (0x80000001, 0x20000000),
-    (0x1, 0x40000000),
-    (0x1, 0x80000000),
-)
+from .rng import LCRNG
+
+JUMP_DATA = LCRNG.jump_table
 
 def lcrng_distance(state0: int, state1: int) -> int:
     """Efficiently compute the distance from LCRNG state0 -> state1"""
-    mask = 1
-    dist = 0
-
-    for mult, add in JUMP_DATA:
-        if state0 == state1:
-            break
-
-        if (state0 ^ state1) & mask:
-            state0 = (state0 * mult + add) & 0xFFFFFFFF
-            dist += mask
-
-        mask <<= 1
-
-    return dist
+    return LCRNG.distance(state0, state1)
 
 def get_pid_list(key_word: str = None):
     """Get list of processes"""
@@ -83,6 +38,19 @@ def get_pid_list(key_word: str = None):
 
 CACHED_TAGS = []
 
+def sprite_texture_data(img: Image.Image) -> list[float]:
+    """Convert an image to flat RGBA floats for a dpg texture"""
+    img = img.convert("RGBA")
+    dpg_image = []
+    for i in range(0, img.height):
+        for j in range(0, img.width):
+            pixel = img.getpixel((j, i))
+            dpg_image.append(pixel[0] / 255)
+            dpg_image.append(pixel[1] / 255)
+            dpg_image.append(pixel[2] / 255)
+            dpg_image.append(pixel[3] / 255)
+    return dpg_image
+
 def load_sprite(species: int, form: int, shiny: bool):
     """Load sprite for use in dpg1"""
     if species == 0:
@@ -93,15 +61,7 @@ def load_sprite(species: int, form: int, shiny: bool):
         return name
     url = f"https://github.com/kwsch/PKHeX/blob/master/PKHeX.Drawing.PokeSprite/Resources/img/Big%20{'Shiny' if shiny else 'Pokemon'}%20Sprites/b_{name}.png?raw=true"
     response = requests.get(url)
-    img = Image.open(BytesIO(response.content)).convert("RGBA")
-    dpg_image = []
-    for i in range(0, img.height):
-        for j in range(0, img.width):
-            pixel = img.getpixel((j, i))
-            dpg_image.append(pixel[0] / 255)
-            dpg_image.append(pixel[1] / 255)
-            dpg_image.append(pixel[2] / 255)
-            dpg_image.append(pixel[3] / 255)
+    dpg_image = sprite_texture_data(Image.open(BytesIO(response.content)))
     CACHED_TAGS.append(name)
     with dpg.texture_registry(show=False):
         return dpg.add_static_texture(
@@ -111,6 +71,14 @@ def load_sprite(species: int, form: int, shiny: bool):
             default_value=dpg_image,
         )
 
+NATURES = (
+    "Hardy", "Lonely", "Brave", "Adamant", "Naughty",
+    "Bold", "Docile", "Relaxed", "Impish", "Lax",
+    "Timid", "Hasty", "Serious", "Jolly", "Naive",
+    "Modest", "Mild", "Quiet", "Bashful", "Rash",
+    "Calm", "Gentle", "Sassy", "Careful", "Quirky",
+)
+
 SPECIES_MAP = [
     0,
     1,
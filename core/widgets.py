@@ -0,0 +1,190 @@
+"""Reusable dearpygui widgets"""
+
+from abc import abstractmethod
+from typing import Callable
+import dearpygui.dearpygui as dpg
+import numpy as np
+
+from .generator import method1_array
+
+
+class DataSource:
+    """Rows for a VirtualTable"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of rows"""
+
+    @abstractmethod
+    def rows(self, start: int, count: int) -> np.ndarray:
+        """Rows start..start + count - 1"""
+
+    @abstractmethod
+    def index_of(self, advance: int) -> int | None:
+        """Row index of an advance"""
+
+
+class ArrayDataSource(DataSource):
+    """Rows held in a NumPy structured array with an "advance" field"""
+
+    def __init__(self, array: np.ndarray) -> None:
+        self.array = array
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def rows(self, start: int, count: int) -> np.ndarray:
+        return self.array[start:start + count]
+
+    def index_of(self, advance: int) -> int | None:
+        index = int(np.searchsorted(self.array["advance"], advance))
+        if index < len(self.array) and self.array["advance"][index] == advance:
+            return index
+        return None
+
+
+class Method1DataSource(DataSource):
+    """Method 1 results generated a page at a time"""
+
+    PAGE_SIZE = 0x1000
+
+    def __init__(self, seed: int, start: int, count: int, tsv: int = None) -> None:
+        self.seed = seed
+        self.start = start
+        self.count = count
+        self.tsv = tsv
+        self.page_start = None
+        self.page: np.ndarray = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def rows(self, start: int, count: int) -> np.ndarray:
+        count = min(count, self.count - start)
+        if (
+            self.page is None
+            or start < self.page_start
+            or start + count > self.page_start + len(self.page)
+        ):
+            self.page_start = start
+            self.page = method1_array(
+                self.seed,
+                self.start + start,
+                min(max(self.PAGE_SIZE, count), self.count - start),
+                self.tsv
+            )
+        return self.page[start - self.page_start:start - self.page_start + count]
+
+    def index_of(self, advance: int) -> int | None:
+        if self.start <= advance < self.start + self.count:
+            return advance - self.start
+        return None
+
+
+class VirtualTable:
+    """Table that only creates widgets for its visible rows
+
+    A fixed pool of rows is recycled as the table is scrolled, so the size of the
+    data source does not affect frame time
+    """
+
+    SCROLL_STEP = 3
+    HIGHLIGHT_COLOR = (255, 255, 0, 80)
+
+    def __init__(
+        self,
+        columns: list[tuple[str, Callable[[np.void], str]]],
+        data_source: DataSource = None,
+        visible_rows: int = 12,
+        width: int = -1,
+    ) -> None:
+        self.columns = columns
+        self.data_source = data_source
+        self.visible_rows = visible_rows
+        self.offset = 0
+        self.highlighted_row = None
+
+        with dpg.group(horizontal=True):
+            with dpg.table(header_row=True, width=width, policy=dpg.mvTable_SizingFixedFit) as self.table:
+                for header, _ in columns:
+                    dpg.add_table_column(label=header)
+                self.cells = []
+                for _ in range(visible_rows):
+                    with dpg.table_row():
+                        self.cells.append([dpg.add_text("") for _ in columns])
+            self.scrollbar = dpg.add_slider_int(
+                vertical=True,
+                height=visible_rows * 22,
+                width=14,
+                min_value=0,
+                max_value=0,
+                format="",
+                callback=lambda _sender, app_data: self.scroll_to(self.max_offset - app_data),
+            )
+        with dpg.handler_registry() as self.handler_registry:
+            dpg.add_mouse_wheel_handler(callback=self.on_mouse_wheel)
+        self.set_data_source(data_source)
+
+    @property
+    def max_offset(self) -> int:
+        """Largest valid first visible row"""
+        if self.data_source is None:
+            return 0
+        return max(len(self.data_source) - self.visible_rows, 0)
+
+    def set_data_source(self, data_source: DataSource | None) -> None:
+        """Show a new data source from the top"""
+        self.data_source = data_source
+        # slider values are 32-bit
+        dpg.configure_item(self.scrollbar, max_value=min(self.max_offset, 0x7FFFFFFF))
+        self.offset = 0
+        self.refresh()
+
+    def on_mouse_wheel(self, _sender, app_data) -> None:
+        """Scroll while hovered"""
+        if dpg.is_item_hovered(self.table):
+            self.scroll_to(self.offset - int(app_data) * self.SCROLL_STEP)
+
+    def scroll_to(self, offset: int) -> None:
+        """Set the first visible row"""
+        offset = min(max(offset, 0), self.max_offset)
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def jump_to(self, advance: int) -> bool:
+        """Center an advance, returning whether it is in the data source"""
+        if self.data_source is None:
+            return False
+        index = self.data_source.index_of(advance)
+        if index is None:
+            return False
+        self.scroll_to(index - self.visible_rows // 2)
+        return True
+
+    def refresh(self) -> None:
+        """Fill the row pool from the data source"""
+        rows = self.data_source.rows(self.offset, self.visible_rows) if self.data_source else ()
+        for i, cells in enumerate(self.cells):
+            for cell, (_, formatter) in zip(cells, self.columns):
+                dpg.set_value(cell, formatter(rows[i]) if i < len(rows) else "")
+        dpg.set_value(self.scrollbar, min(self.max_offset - self.offset, 0x7FFFFFFF))
+        self.set_highlight(None)
+
+    def set_highlight(self, row: int | None) -> None:
+        """Highlight a visible row"""
+        if row == self.highlighted_row:
+            return
+        if self.highlighted_row is not None:
+            dpg.unhighlight_table_row(self.table, self.highlighted_row)
+        if row is not None:
+            dpg.highlight_table_row(self.table, row, self.HIGHLIGHT_COLOR)
+        self.highlighted_row = row
+
+    def highlight(self, advance: int) -> None:
+        """Highlight the row of an advance if it is visible"""
+        index = self.data_source.index_of(advance) if self.data_source else None
+        row = None
+        if index is not None and 0 <= index - self.offset < self.visible_rows:
+            row = index - self.offset
+        self.set_highlight(row)
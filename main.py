@@ -9,64 +9,122 @@ import mem_edit
 
 from core.util import get_pid_list, load_sprite
 from core.instance.gbarng import GBA as Instance
-from core.exceptions import AddressOutOfRange
+from core.hook.mgba_hook import MGBAHook
+from core.hook.socket_hook import SocketHook
+from core.exceptions import AddressOutOfRange, EmulatorNotResponding
 
 instance: Instance = None
-windows = ()
+memory_windows = ()
+ui_windows = ()
 
 logging.getLogger().setLevel(logging.INFO)
 
 def file_callback():
     """Select ROM file"""
     # TODO: axe globals
-    global instance, windows
+    global instance, memory_windows, ui_windows
     # needed for filedialog
     root = tk.Tk()
     root.withdraw()
     file_path = filedialog.askopenfilename()
     dpg.set_value(file_label, file_path)
+    if instance is not None:
+        instance.close()
     instance = Instance(file_path)
-    windows = instance.get_windows()
+    instance.sampler.enabled = dpg.get_value(sampling_checkbox)
+    memory_windows, ui_windows = instance.get_windows()
 
 def hook_callback():
     """Hook into the selected process"""
     global instance
 
     pid = int(dpg.get_value(pid_dropdown).split("(")[-1][:-1])
+    if not isinstance(instance.hook, MGBAHook):
+        instance.hook.detach()
+        instance.hook = MGBAHook()
     instance.hook.hook(pid)
+    if instance.hook.backend is not None:
+        dpg.set_value(
+            backend_label,
+            f"Backend: {instance.hook.backend.name}\n" + "\n".join(
+                f"  {name}: {rate:.0f} reads/s"
+                for name, rate in instance.hook.backend_throughput.items()
+            )
+        )
+
+def socket_callback():
+    """Connect to the in-emulator read server"""
+    global instance
+
+    instance.hook.detach()
+    instance.hook = SocketHook()
+    instance.hook.hook(dpg.get_value(port_input))
+    dpg.set_value(backend_label, "Backend: socket")
+
+def sampling_callback(_sender, app_data):
+    """Toggle frame-aligned sampling"""
+    if instance is not None:
+        instance.sampler.enabled = app_data
 
 def refresh_callback():
     """Refresh process list"""
     dpg.configure_item(pid_dropdown, items=get_pid_list(Instance.KEY_WORD))
 
-dpg.create_context()
-dpg.create_viewport(title="RNG Assistant", width=800, height=600, vsync=False)
-dpg.setup_dearpygui()
+def main():
+    """Set up the settings window and run the render loop"""
+    global file_label, pid_dropdown, port_input, backend_label, sampling_checkbox
+
+    dpg.create_context()
+    dpg.create_viewport(title="RNG Assistant", width=800, height=600, vsync=False)
+    dpg.setup_dearpygui()
 
-# pre-load blank sprite
-load_sprite(0, 0, False)
+    # pre-load blank sprite
+    load_sprite(0, 0, False)
 
-with dpg.window(tag="Settings"):
-    file_label = dpg.add_text("No Rom Selected...")
-    file_selector = dpg.add_button(label="Select Rom", callback=file_callback)
-    pid_dropdown = dpg.add_combo(get_pid_list(Instance.KEY_WORD))
-    hook_button = dpg.add_button(label="Hook", callback=hook_callback)
-    refresh_button = dpg.add_button(label="Refresh", callback=refresh_callback)
+    with dpg.window(tag="Settings"):
+        file_label = dpg.add_text("No Rom Selected...")
+        dpg.add_button(label="Select Rom", callback=file_callback)
+        pid_dropdown = dpg.add_combo(get_pid_list(Instance.KEY_WORD))
+        dpg.add_button(label="Hook", callback=hook_callback)
+        dpg.add_button(label="Refresh", callback=refresh_callback)
+        port_input = dpg.add_input_int(
+            label="Port", default_value=SocketHook.DEFAULT_PORT, width=100
+        )
+        dpg.add_button(label="Connect Socket", callback=socket_callback)
+        backend_label = dpg.add_text("Backend:")
+        sampling_checkbox = dpg.add_checkbox(
+            label="Frame-Aligned Sampling", default_value=True, callback=sampling_callback
+        )
 
+    dpg.show_viewport()
+    dpg.set_primary_window("Settings", True)
+    while dpg.is_dearpygui_running():
+        if instance is not None:
+            instance.jobs.poll()
+            if instance.hook.is_initialized:
+                try:
+                    if instance.sampler.poll():
+                        instance.prefetch()
+                        for window_update in memory_windows:
+                            window_update()
+                except (AddressOutOfRange,) as error:
+                    logging.error(error)
+                except EmulatorNotResponding:
+                    # paused emulator, keep the connection and retry later
+                    instance.sampler.paused = True
+                except (mem_edit.utils.MemEditError, OSError) as error:
+                    logging.error(error)
+                    instance.hook.detach()
+            # local state only, keeps refreshing while emulation is paused
+            for window_update in ui_windows:
+                window_update()
+        dpg.render_dearpygui_frame()
 
-dpg.show_viewport()
-dpg.set_primary_window("Settings", True)
-while dpg.is_dearpygui_running():
     if instance is not None:
-        if instance.hook.is_initialized:
-            try:
-                for window_update in windows:
-                    window_update()
-            except (AddressOutOfRange,) as error:
-                logging.error(error)
-            except (mem_edit.utils.MemEditError, OSError) as error:
-                logging.error(error)
-                instance.hook.detach()
-    dpg.render_dearpygui_frame()
-
-dpg.destroy_context()
+        instance.close()
+    dpg.destroy_context()
+
+
+if __name__ == "__main__":
+    # worker processes re-import this module, only the parent runs the gui
+    main()
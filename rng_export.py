@@ -0,0 +1,46 @@
+"""Export method 1 RNG results to a directory of .npy columns"""
+
+import argparse
+import os
+import sys
+
+from core.export import export_method1, DEFAULT_CHUNK_SIZE
+
+
+def main():
+    """Export results described on the command line"""
+    parser = argparse.ArgumentParser(
+        description="Stream method 1 results to memory-mapped .npy columns (resumable)"
+    )
+    parser.add_argument("output", help="directory to write one .npy file per column to")
+    parser.add_argument("seed", type=lambda value: int(value, 16), help="initial seed (hex)")
+    parser.add_argument("count", type=int, help="number of advances")
+    parser.add_argument("--start", type=int, default=0, help="first advance")
+    parser.add_argument("--tid", type=int, help="TID for shininess")
+    parser.add_argument("--sid", type=int, help="SID for shininess")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes to use")
+    args = parser.parse_args()
+
+    tsv = None
+    if args.tid is not None and args.sid is not None:
+        tsv = args.tid ^ args.sid
+
+    def progress(done: int, total: int):
+        print(f"\r{done}/{total} chunks", end="", file=sys.stderr, flush=True)
+
+    export_method1(
+        args.output,
+        args.seed,
+        args.count,
+        args.start,
+        tsv,
+        args.chunk_size,
+        args.workers,
+        progress,
+    )
+    print(file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
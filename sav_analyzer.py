@@ -0,0 +1,105 @@
+"""Offline Gen 3 save analyzer"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+
+from numba_pokemon_prngs.data import SPECIES_EN
+
+from core.sav import SAV3, BOX_SLOTS
+from core.pkm.pk3 import PK3
+
+FIELDS = ("file", "location", "pid", "ivs", "species", "shiny", "valid")
+
+
+def pk3_record(path: str, location: str, pk3: PK3) -> dict:
+    """Output record of a pokemon"""
+    return {
+        "file": path,
+        "location": location,
+        "pid": f"{pk3.pid:08X}",
+        "ivs": pk3.ivs,
+        "species": SPECIES_EN[pk3.species],
+        "shiny": pk3.shiny,
+        "valid": pk3.is_valid,
+    }
+
+
+def analyze_save(path: str) -> list[dict]:
+    """Records of every party and box pokemon of a save file"""
+    try:
+        sav = SAV3.open(path)
+    except (OSError, ValueError) as error:
+        logging.error(f"{path}: {error}")
+        return []
+    try:
+        records = [
+            pk3_record(path, f"Party {slot + 1}", pk3)
+            for slot, pk3 in enumerate(sav.party)
+        ]
+        for i, pk3 in enumerate(sav.boxes):
+            if pk3 is not None:
+                records.append(
+                    pk3_record(path, f"Box {i // BOX_SLOTS + 1} Slot {i % BOX_SLOTS + 1}", pk3)
+                )
+    finally:
+        sav.close()
+    return records
+
+
+def find_saves(paths: list[str]) -> list[str]:
+    """Expand directories into the .sav files they contain"""
+    saves = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                saves.extend(
+                    os.path.join(root, file) for file in sorted(files)
+                    if file.lower().endswith(".sav")
+                )
+        else:
+            saves.append(path)
+    return saves
+
+
+def main():
+    """Analyze save files given on the command line"""
+    parser = argparse.ArgumentParser(description="Decode party and box pokemon of Gen 3 saves")
+    parser.add_argument("paths", nargs="+", help=".sav files or directories of them")
+    parser.add_argument("--format", choices=("csv", "json"), default="csv")
+    parser.add_argument("--output", help="output file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes to use")
+    args = parser.parse_args()
+
+    saves = find_saves(args.paths)
+    output = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            file_records = executor.map(
+                analyze_save,
+                saves,
+                chunksize=max(1, len(saves) // (args.workers * 4))
+            )
+            if args.format == "csv":
+                writer = csv.DictWriter(output, FIELDS)
+                writer.writeheader()
+                for records in file_records:
+                    for record in records:
+                        writer.writerow(record | {"ivs": "/".join(map(str, record["ivs"]))})
+            else:
+                json.dump(
+                    [record for records in file_records for record in records],
+                    output,
+                    indent=2,
+                )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+-- Read server for SocketHook, load through mGBA's Tools > Scripting
+--
+-- Protocol (little endian), every message starts with a u8 type and a u32 sequence:
+--   client read request:      type 1, sequence, u32 range count, (u32 address, u32 length) per range
+--   client subscribe request: type 2, sequence, u32 range count, (u32 address, u32 length) per range
+--   server read reply:        type 1, sequence of the request, u32 length, the ranges' bytes
+--   server snapshot:          type 2, sequence of the subscription, u32 length, the ranges' bytes
+--
+-- mGBA only dispatches socket events when they are polled and scripts only run
+-- from emulator callbacks, so everything happens in the frame callback: read
+-- requests are answered at the end of the frame they arrive in (up to ~16.7ms
+-- at normal speed) and every client's subscribed ranges are pushed as one
+-- snapshot per frame, which the client reads without a round trip. Nothing is
+-- sent while emulation is paused; SocketHook keeps serving the last snapshot,
+-- which is still current, and times out other reads.
+
+local PORT = 8888
+
+local READ = 1
+local SUBSCRIBE = 2
+local REPLY = 1
+local SNAPSHOT = 2
+
+local server = nil
+local clients = {}
+local buffers = {}
+-- client id -> {sequence = n, ranges = {{address, length}, ...}}
+local subscriptions = {}
+local next_id = 1
+
+local function read_ranges(ranges)
+    local parts = {}
+    for i, range in ipairs(ranges) do
+        parts[i] = emu:readRange(range[1], range[2])
+    end
+    return table.concat(parts)
+end
+
+local function send_message(sock, message_type, sequence, data)
+    sock:send(string.pack("<BI4I4", message_type, sequence, #data) .. data)
+end
+
+local function handle_requests(id)
+    local sock = clients[id]
+    local buffer = buffers[id]
+    while #buffer >= 9 do
+        local message_type, sequence, count = string.unpack("<BI4I4", buffer)
+        local request_length = 9 + count * 8
+        if #buffer < request_length then
+            break
+        end
+        local ranges = {}
+        for i = 0, count - 1 do
+            local address, length = string.unpack("<I4I4", buffer, 10 + i * 8)
+            ranges[#ranges + 1] = {address, length}
+        end
+        if message_type == READ then
+            send_message(sock, REPLY, sequence, read_ranges(ranges))
+        elseif message_type == SUBSCRIBE then
+            if count == 0 then
+                subscriptions[id] = nil
+            else
+                subscriptions[id] = {sequence = sequence, ranges = ranges}
+            end
+        end
+        buffer = string.sub(buffer, request_length + 1)
+    end
+    buffers[id] = buffer
+end
+
+local function close_client(id)
+    local sock = clients[id]
+    clients[id] = nil
+    buffers[id] = nil
+    subscriptions[id] = nil
+    if sock then
+        sock:close()
+    end
+end
+
+local function on_received(id)
+    local sock = clients[id]
+    if not sock then
+        return
+    end
+    while true do
+        local data, err = sock:receive(4096)
+        if data then
+            buffers[id] = buffers[id] .. data
+        else
+            if err ~= socket.ERRORS.AGAIN then
+                close_client(id)
+                return
+            end
+            break
+        end
+    end
+    handle_requests(id)
+end
+
+local function on_accept()
+    local sock, err = server:accept()
+    if err then
+        console:error("Read server accept failed: " .. tostring(err))
+        return
+    end
+    local id = next_id
+    next_id = next_id + 1
+    clients[id] = sock
+    buffers[id] = ""
+    sock:add("received", function() on_received(id) end)
+    sock:add("error", function() close_client(id) end)
+end
+
+-- there is no callback that runs between frames or while paused
+callbacks:add("frame", function()
+    if server then
+        server:poll()
+    end
+    for _, sock in pairs(clients) do
+        sock:poll()
+    end
+    for id, subscription in pairs(subscriptions) do
+        local sock = clients[id]
+        if sock then
+            send_message(sock, SNAPSHOT, subscription.sequence, read_ranges(subscription.ranges))
+        end
+    end
+end)
+
+local err
+server, err = socket.bind(nil, PORT)
+if err then
+    console:error("Read server could not bind port " .. PORT .. ": " .. tostring(err))
+else
+    _, err = server:listen()
+    if err then
+        server:close()
+        console:error("Read server could not listen: " .. tostring(err))
+    else
+        server:add("received", on_accept)
+        console:log("Read server listening on port " .. PORT)
+    end
+end
@@ -0,0 +1,239 @@
+"""Socket hook protocol against the local stand-in server and raw servers"""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from core.exceptions import EmulatorNotResponding
+from core.hook.socket_hook import (
+    MESSAGE_HEADER,
+    REQUEST_COUNT,
+    REQUEST_RANGE,
+    RESPONSE_LENGTH,
+    READ,
+    REPLY,
+    SocketBackend,
+    SocketHook,
+    recv_exact,
+)
+from core.hook.socket_server import LocalReadServer
+
+EWRAM = 0x2000000
+IWRAM = 0x3000000
+
+
+@pytest.fixture
+def server():
+    ewram = bytearray(i & 0xFF for i in range(0x40000))
+    iwram = bytearray(0x8000)
+    server = LocalReadServer({EWRAM: ewram, IWRAM: iwram}).start()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def hook(server):
+    hook = SocketHook()
+    hook.hook(server.port)
+    assert hook.is_initialized
+    yield hook
+    hook.detach()
+
+
+def wait_until(predicate, timeout: float = 1.0) -> None:
+    """Poll predicate until it holds"""
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        assert time.perf_counter() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def raw_server(respond) -> tuple[int, threading.Thread]:
+    """Listener handing its first connection and each parsed read request to respond"""
+    listener = socket.create_server(("127.0.0.1", 0))
+
+    def serve():
+        with listener:
+            connection, _ = listener.accept()
+        with connection:
+            try:
+                while True:
+                    _, sequence = MESSAGE_HEADER.unpack(recv_exact(connection, MESSAGE_HEADER.size))
+                    (count,) = REQUEST_COUNT.unpack(recv_exact(connection, REQUEST_COUNT.size))
+                    ranges = list(
+                        REQUEST_RANGE.iter_unpack(recv_exact(connection, count * REQUEST_RANGE.size))
+                    )
+                    if not respond(connection, sequence, ranges):
+                        return
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    return listener.getsockname()[1], thread
+
+
+def reply(sequence: int, data: bytes) -> bytes:
+    """Encoded read reply"""
+    return MESSAGE_HEADER.pack(REPLY, sequence) + RESPONSE_LENGTH.pack(len(data)) + data
+
+
+def test_read_bytes(hook, server):
+    server.regions[IWRAM][0x10:0x14] = b"\x01\x02\x03\x04"
+    assert hook.read_bytes(IWRAM + 0x10, 4) == b"\x01\x02\x03\x04"
+    assert hook.read_uint(EWRAM + 0x100, 2) == 0x0100
+
+
+def test_read_many_is_one_request(hook, server):
+    requests = []
+    read_ranges = server.read_ranges
+
+    def counting_read_ranges(ranges):
+        requests.append(ranges)
+        return read_ranges(ranges)
+
+    server.read_ranges = counting_read_ranges
+    ranges = [(EWRAM, 4), (EWRAM + 0x200, 2), (IWRAM, 8)]
+    assert hook.read_many(ranges) == [
+        bytes([0, 1, 2, 3]), bytes([0, 1]), bytes(8)
+    ]
+    assert requests == [ranges]
+
+
+def test_split_reply():
+    data = bytes(range(0x64))
+
+    def respond(connection, sequence, ranges):
+        for byte in reply(sequence, data):
+            connection.sendall(bytes((byte,)))
+        return True
+
+    port, _ = raw_server(respond)
+    backend = SocketBackend("127.0.0.1", port)
+    try:
+        assert backend.read_many([(EWRAM, 0x20), (EWRAM + 0x40, 0x44)]) == [data[:0x20], data[0x20:]]
+    finally:
+        backend.close()
+
+
+def test_short_reply_closes():
+    def respond(connection, sequence, ranges):
+        connection.sendall(reply(sequence, bytes(8))[:-4])
+        return False
+
+    port, _ = raw_server(respond)
+    backend = SocketBackend("127.0.0.1", port)
+    try:
+        with pytest.raises(ConnectionError):
+            backend.read(EWRAM, 8)
+        with pytest.raises(ConnectionError):
+            backend.read(EWRAM, 8)
+    finally:
+        backend.close()
+
+
+def test_length_mismatch():
+    def respond(connection, sequence, ranges):
+        connection.sendall(reply(sequence, bytes(2)))
+        return True
+
+    port, _ = raw_server(respond)
+    backend = SocketBackend("127.0.0.1", port)
+    try:
+        with pytest.raises(OSError, match="length"):
+            backend.read(EWRAM, 4)
+    finally:
+        backend.close()
+
+
+def test_paused_server_keeps_connection(hook, server):
+    backend = hook.backend
+    server.pause()
+    start = time.perf_counter()
+    with pytest.raises(EmulatorNotResponding):
+        hook.read_bytes(EWRAM + 1, 1)
+    assert time.perf_counter() - start < 4 * SocketBackend.READ_TIMEOUT
+    # fails fast until the retry interval is over
+    start = time.perf_counter()
+    with pytest.raises(EmulatorNotResponding):
+        hook.read_bytes(EWRAM + 2, 1)
+    assert time.perf_counter() - start < SocketBackend.READ_TIMEOUT / 2
+    server.resume()
+    # the held back reply arrives late and is dropped
+    wait_until(lambda: backend.stalled_until == 0.0)
+    assert hook.is_initialized and hook.backend is backend
+    assert hook.read_bytes(EWRAM + 3, 1) == b"\x03"
+    assert backend.replies == {}
+
+
+def test_snapshot_served_without_round_trip(hook, server):
+    ranges = [(EWRAM + 0x10, 4), (IWRAM, 4)]
+    # no snapshot yet, falls back to a read
+    hook.prefetch(ranges)
+    assert hook.prefetched == [(EWRAM + 0x10, bytes([0x10, 0x11, 0x12, 0x13])), (IWRAM, bytes(4))]
+    server.regions[IWRAM][0:4] = b"\x07\x00\x00\x00"
+    server.frame()
+    wait_until(lambda: hook.backend.latest(IWRAM, 4) == b"\x07\x00\x00\x00")
+    server.pause()
+    # a paused emulator still has its last snapshot served
+    hook.prefetch(ranges)
+    assert hook.read_uint(IWRAM, 4) == 7
+    assert hook.read_bytes(IWRAM + 2, 2, cached=False) == bytes(2)
+    with pytest.raises(EmulatorNotResponding):
+        hook.read_bytes(IWRAM + 8, 4)
+
+
+def test_new_subscription_ignores_old_snapshot(hook, server):
+    hook.prefetch([(IWRAM, 4)])
+    server.frame()
+    wait_until(lambda: hook.backend.latest(IWRAM, 4) is not None)
+    hook.prefetch([(IWRAM + 4, 4)])
+    assert hook.backend.latest(IWRAM, 4) is None
+    server.frame()
+    wait_until(lambda: hook.backend.latest(IWRAM + 4, 4) is not None)
+
+
+def test_concurrent_reads(hook):
+    errors = []
+
+    def read(offset):
+        try:
+            for _ in range(200):
+                assert hook.read_bytes(EWRAM + offset, 2, cached=False) == bytes(
+                    [offset & 0xFF, (offset + 1) & 0xFF]
+                )
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=read, args=(offset,)) for offset in range(0, 0x80, 0x10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_server_closed(hook, server):
+    server.close()
+    wait_until(lambda: hook.backend.error is not None)
+    with pytest.raises(ConnectionError):
+        hook.read_bytes(EWRAM, 4)
+
+
+def test_connect_timeout():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(0)
+    port = listener.getsockname()[1]
+    # never accepted, fills the backlog so further connects hang
+    pending = []
+    try:
+        with pytest.raises(EmulatorNotResponding):
+            for _ in range(16):
+                pending.append(SocketBackend("127.0.0.1", port, timeout=0.2))
+    finally:
+        for backend in pending:
+            backend.close()
+        listener.close()